@@ -22,46 +22,94 @@
 
 
 #include <iostream>
+#include <optional>
 
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
 #include <pybind11/stl.h>
+#include <pybind11/functional.h>
 
 #include "world.hpp"
 #include "entity.hpp"
 #include "filter.hpp"
+#include "system.hpp"
+#include "observer.hpp"
+#include "snapshot.hpp"
 
 namespace py = pybind11;
 using namespace pyflecs;
 
-void wrap_entity_set(entity* e, entity*c,
+py::array_t<ecs_entity_t> wrap_entity_ids(const ecs_entity_t* ids,
+    int32_t count)
+{
+    // The ids live in flecs-owned scratch storage, so copy them out in a
+    // single memcpy rather than wrapping each one.
+    return py::array_t<ecs_entity_t>(count, ids);
+}
+
+void wrap_entity_set(entity* e, ecs_id_t c,
     py::array_t<uint8_t, py::array::c_style | py::array::forcecast> data)
 {
     py::buffer_info info = data.request();
-    e->set(*c, data.nbytes(), info.ptr);
+    e->set(c, data.nbytes(), info.ptr);
 }
 
-py::array_t<uint8_t> wrap_entity_get(entity* e, entity* c)
+py::array_t<uint8_t> wrap_entity_get(entity* e, ecs_id_t c, py::object owner)
 {
-    auto ptr = reinterpret_cast<const uint8_t*>(e->get(*c));
-    // Must pass a dummy owner such that pybind will return the data without
+    auto ptr = reinterpret_cast<const uint8_t*>(e->get(c));
+    // Must pass an owner such that pybind will return the data without
     // modification: https://github.com/pybind/pybind11/issues/323
-    py::str dummy;
-    return py::array_t<uint8_t>(c->size(), ptr, dummy);
+    // The owner is the world, so closing it never frees memory a view still
+    // points to.
+    return py::array_t<uint8_t>(entity(e->world(), c).size(), ptr, owner);
 }
 
-void wrap_entity_set_pair(entity* e, entity* c, entity* other,
+void wrap_entity_set_pair(entity* e, ecs_entity_t c, ecs_entity_t other,
     py::array_t<uint8_t, py::array::c_style | py::array::forcecast> data)
 {
     py::buffer_info info = data.request();
-    e->set_pair(*c, *other, data.nbytes(), info.ptr);
+    e->set_pair(c, other, data.nbytes(), info.ptr);
 }
 
-void wrap_bulk_entity_add(bulk_entity_builder *builder, entity* c,
-    py::array_t<uint8_t, py::array::c_style | py::array::forcecast> data)
+void wrap_bulk_entity_add(bulk_entity_builder *builder, ecs_id_t c,
+    py::array data)
 {
+    // The builder only keeps a pointer until build, so the data is used as
+    // is rather than through a converted temporary that would be freed on
+    // return.
+    if (!(data.flags() & py::array::c_style))
+        throw std::invalid_argument("Bulk data must be C-contiguous");
     py::buffer_info info = data.request();
-    builder->add(c->raw(), info.ptr);
+    builder->add(c, info.ptr);
+}
+
+void wrap_bulk_entity_set_entities(bulk_entity_builder *builder,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids)
+{
+    if (ids.size() != builder->count())
+        throw std::invalid_argument("Expected one id per entity");
+    builder->set_entities(ids.data(), ids.size());
+}
+
+py::array_t<ecs_entity_t> wrap_bulk_entity_build(bulk_entity_builder* builder)
+{
+    return wrap_entity_ids(builder->build(), builder->count());
+}
+
+py::array_t<ecs_entity_t> wrap_world_bulk_entity_w_id(world* w, ecs_id_t eid,
+    int32_t count)
+{
+    return wrap_entity_ids(w->bulk_entity_w_id(eid, count), count);
+}
+
+/**
+ * Returns the owner of views into the storage visited by an iterator. The
+ * iterator keeps its filter and world alive, so closing the world never frees
+ * memory a view still points to.
+ */
+py::object view_owner(pyflecs::iter* iter)
+{
+    return py::cast(iter, py::return_value_policy::reference);
 }
 
 py::array_t<uint8_t> wrap_iter_term(pyflecs::iter *iter, entity& e,
@@ -76,23 +124,303 @@ py::array_t<uint8_t> wrap_iter_term(pyflecs::iter *iter, entity& e,
     if (result == nullptr)
         size = 0;
 
-    py::str dummy; // See note above about ownership
-    return py::array_t<uint8_t>(size, result, dummy);
+    return py::array_t<uint8_t>(size, result, view_owner(iter));
+}
+
+/**
+ * A precompiled description of the views to build for each table: the term
+ * index, dtype and element shape of every column. Terms without data, such
+ * as tags, have a None dtype.
+ */
+struct column_plan {
+    std::vector<int32_t> indices;
+    std::vector<py::object> dtypes;
+    std::vector<std::vector<py::ssize_t>> shapes;
+};
+
+py::object wrap_iter_column(pyflecs::iter *iter, const column_plan& plan,
+    py::ssize_t pos)
+{
+    py::ssize_t num_columns = plan.indices.size();
+    if (pos < 0)
+        pos += num_columns;
+    if (pos < 0 || pos >= num_columns)
+        throw py::index_error("Column index out of range");
+    if (plan.dtypes[pos].is_none())
+        return py::none();
+
+    int32_t idx = plan.indices[pos];
+    auto data = iter->term_data(idx);
+    py::ssize_t count = data == nullptr ? 0 : iter->count();
+
+    std::vector<py::ssize_t> shape{ count };
+    shape.insert(shape.end(), plan.shapes[pos].begin(), plan.shapes[pos].end());
+
+    // C-contiguous strides within an element. A term shared from a base
+    // entity stores a single element, which is broadcast to every row with
+    // a zero row stride.
+    auto dtype = py::reinterpret_borrow<py::dtype>(plan.dtypes[pos]);
+    std::vector<py::ssize_t> strides(shape.size());
+    py::ssize_t stride = dtype.itemsize();
+    for (size_t dim = shape.size() - 1; dim > 0; dim--)
+    {
+        strides[dim] = stride;
+        stride *= shape[dim];
+    }
+    bool owned = iter->term_owned(idx);
+    strides[0] = owned ? stride : 0;
+
+    py::array result(dtype, shape, strides, data, view_owner(iter));
+    if (!owned)
+    {
+        // Writing a row would write the value of every instance
+        py::detail::array_proxy(result.ptr())->flags &=
+            ~py::detail::npy_api::NPY_ARRAY_WRITEABLE_;
+    }
+    return result;
+}
+
+py::tuple wrap_iter_columns(pyflecs::iter *iter, const column_plan& plan)
+{
+    py::tuple result(plan.indices.size());
+    for (size_t pos = 0; pos < plan.indices.size(); pos++)
+        result[pos] = wrap_iter_column(iter, plan, pos);
+    return result;
+}
+
+py::array_t<ecs_entity_t> wrap_iter_entities(pyflecs::iter *iter)
+{
+    // A view over ecs_iter_t::entities, valid until the iterator advances.
+    py::array_t<ecs_entity_t> result(iter->count(), iter->entities(),
+        view_owner(iter));
+    py::detail::array_proxy(result.ptr())->flags &=
+        ~py::detail::npy_api::NPY_ARRAY_WRITEABLE_;
+    return result;
+}
+
+py::array_t<ecs_entity_t> wrap_iter_collect_entities(pyflecs::iter *iter)
+{
+    auto ids = iter->collect_entities();
+    return py::array_t<ecs_entity_t>(ids.size(), ids.data());
 }
 
-void wrap_world_set(world* w, entity* c,
+py::dict wrap_world_info(world* w)
+{
+    auto info = w->info();
+    py::dict result;
+    result["id_count"] = info->id_count;
+    result["component_id_count"] = info->component_id_count;
+    result["pair_id_count"] = info->pair_id_count;
+    result["table_count"] = info->table_count;
+    result["empty_table_count"] = info->empty_table_count;
+    result["ids_created"] = info->id_create_total;
+    result["ids_deleted"] = info->id_delete_total;
+    result["tables_created"] = info->table_create_total;
+    result["tables_deleted"] = info->table_delete_total;
+    result["last_id"] = info->last_id;
+    return result;
+}
+
+py::array_t<ecs_id_t> wrap_iter_table_type(pyflecs::iter *iter)
+{
+    auto ids = iter->table_type();
+    return py::array_t<ecs_id_t>(ids.size(), ids.data());
+}
+
+py::array_t<uint8_t> wrap_iter_table_column(pyflecs::iter *iter, ecs_id_t id)
+{
+    size_t size = 0;
+    auto result = reinterpret_cast<const uint8_t*>(
+        iter->table_column(id, size));
+    size_t nbytes = iter->count() * size;
+
+    return py::array_t<uint8_t>(nbytes, result, view_owner(iter));
+}
+
+py::tuple wrap_iter_gather(pyflecs::iter* it, int32_t idx, bool return_ids)
+{
+    auto chunks = it->chunks(idx);
+    size_t rows = 0;
+    size_t size = 0;
+    for (const auto& chunk : chunks)
+    {
+        rows += chunk.count;
+        size = chunk.size;
+    }
+
+    // Allocate the output once, then copy each table's column into place.
+    py::array_t<uint8_t> data(rows * size);
+    py::object ids = py::none();
+    ecs_entity_t* pIds = nullptr;
+    if (return_ids)
+    {
+        py::array_t<ecs_entity_t> id_array(rows);
+        pIds = id_array.mutable_data();
+        ids = id_array;
+    }
+    pyflecs::iter::gather(chunks, data.mutable_data(), pIds);
+    return py::make_tuple(data, ids);
+}
+
+void wrap_iter_scatter(pyflecs::iter* it, int32_t idx,
+    py::array_t<uint8_t, py::array::c_style | py::array::forcecast> data,
+    std::optional<py::array_t<ecs_entity_t,
+        py::array::c_style | py::array::forcecast>> ids)
+{
+    auto chunks = it->chunks(idx);
+    size_t rows = 0;
+    size_t nbytes = 0;
+    for (const auto& chunk : chunks)
+    {
+        if (!chunk.owned)
+            throw std::runtime_error("Cannot scatter into a term shared "
+                "from a base entity");
+        rows += chunk.count;
+        nbytes += chunk.count * chunk.size;
+    }
+
+    if (static_cast<size_t>(data.nbytes()) != nbytes)
+        throw std::runtime_error("Scatter data does not match the number of "
+            "matched entities");
+
+    const ecs_entity_t* pIds = nullptr;
+    if (ids)
+    {
+        if (static_cast<size_t>(ids->size()) != rows)
+            throw std::runtime_error("Table layout changed since the gather");
+        pIds = ids->data();
+    }
+
+    if (!pyflecs::iter::scatter(chunks, data.data(), pIds))
+        throw std::runtime_error("Table layout changed since the gather");
+}
+
+void wrap_world_set(world* w, ecs_entity_t c,
     py::array_t<uint8_t, py::array::c_style | py::array::forcecast> data)
 {
     // The world's entity set for a singleton is just setting the entity
     // to the component.
-    if (!c->has(*c))
-        c->add(*c);
-    wrap_entity_set(c, c, data);
+    entity singleton(w->raw(), c);
+    if (!singleton.has(c))
+        singleton.add(c);
+    wrap_entity_set(&singleton, c, data);
+}
+
+py::array_t<uint8_t> wrap_world_get(py::object self, ecs_entity_t c)
+{
+    entity singleton(self.cast<world*>()->raw(), c);
+    return wrap_entity_get(&singleton, c, self);
+}
+
+py::tuple wrap_world_get_many(world* w, ecs_id_t c,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids,
+    bool return_mask)
+{
+    auto info = ecs_get(w->raw(), c, EcsComponent);
+    if (info == nullptr || info->size == 0)
+        throw std::runtime_error("Id is not a component with data");
+    size_t size = info->size;
+
+    size_t count = ids.size();
+    py::array_t<uint8_t> data(count * size);
+    py::array_t<bool> mask(count);
+    size_t found = w->get_many(c, size, ids.data(), count,
+        data.mutable_data(), mask.mutable_data());
+
+    if (!return_mask && found != count)
+    {
+        auto pMask = mask.data();
+        size_t row = 0;
+        while (pMask[row])
+            row++;
+        throw std::runtime_error("Entity " + std::to_string(ids.at(row)) +
+            " does not have the component");
+    }
+    return py::make_tuple(data, return_mask ? py::object(mask) : py::none());
+}
+
+py::array_t<bool> wrap_world_entities_exist(world* w,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids)
+{
+    py::array_t<bool> result(ids.size());
+    auto pIds = ids.data();
+    auto pResult = result.mutable_data();
+    for (py::ssize_t idx = 0; idx < ids.size(); idx++)
+        pResult[idx] = ecs_exists(w->raw(), pIds[idx]);
+    return result;
+}
+
+void wrap_world_set_many(world* w, ecs_id_t c,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids,
+    py::array_t<uint8_t, py::array::c_style> data)
+{
+    auto info = ecs_get(w->raw(), c, EcsComponent);
+    if (info == nullptr || info->size == 0)
+        throw std::runtime_error("Id is not a component with data");
+    size_t size = info->size;
+    if (static_cast<size_t>(data.size()) != ids.size() * size)
+        throw std::invalid_argument("Expected one value per entity");
+    w->set_many(c, size, ids.data(), ids.size(), data.data());
+}
+
+void wrap_world_add_many(world* w, ecs_id_t c,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids)
+{
+    w->add_many(c, ids.data(), ids.size());
+}
+
+void wrap_world_remove_many(world* w, ecs_id_t c,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids)
+{
+    w->remove_many(c, ids.data(), ids.size());
+}
+
+void wrap_world_delete_many(world* w,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids)
+{
+    w->delete_many(ids.data(), ids.size());
+}
+
+py::array_t<ecs_entity_t> wrap_world_descendants(world* w,
+    py::array_t<ecs_entity_t, py::array::c_style | py::array::forcecast> ids)
+{
+    auto result = w->descendants(ids.data(), ids.size());
+    return py::array_t<ecs_entity_t>(result.size(), result.data());
+}
+
+/**
+ * Adapts an entity method so it can be bound on the world and called with a
+ * raw entity id. Python entity handles only store the id, so this avoids
+ * keeping a bound entity object alive for each of them.
+ */
+template <typename R, typename... Args>
+std::function<R(world*, ecs_entity_t, Args...)> on_id(
+    R (entity::*method)(Args...))
+{
+    return [method](world* w, ecs_entity_t e, Args... args) {
+        entity wrapped(w->raw(), e);
+        return (wrapped.*method)(args...);
+    };
+}
+
+template <typename R, typename... Args>
+std::function<R(world*, ecs_entity_t, Args...)> on_id(
+    R (entity::*method)(Args...) const)
+{
+    return [method](world* w, ecs_entity_t e, Args... args) {
+        const entity wrapped(w->raw(), e);
+        return (wrapped.*method)(args...);
+    };
 }
 
-py::array_t<uint8_t> wrap_world_get(world* w, entity* c)
+template <typename R, typename... Args>
+std::function<R(world*, ecs_entity_t, Args...)> on_id(
+    R (*function)(entity*, Args...))
 {
-    return wrap_entity_get(c, c);
+    return [function](world* w, ecs_entity_t e, Args... args) {
+        entity wrapped(w->raw(), e);
+        return function(&wrapped, args...);
+    };
 }
 
 PYBIND11_MODULE(_flecs, m) {
@@ -130,7 +458,9 @@ PYBIND11_MODULE(_flecs, m) {
         .def("name", &entity::name)
         .def("add", &entity::add)
         .def("set", &wrap_entity_set)
-        .def("get", &wrap_entity_get, py::return_value_policy::reference)
+        .def("get", [](py::object self, ecs_id_t c) {
+                return wrap_entity_get(self.cast<entity*>(), c, self);
+            })
         .def("remove", &entity::remove)
         .def("has", &entity::has)
         .def("raw", &entity::raw)
@@ -153,65 +483,246 @@ PYBIND11_MODULE(_flecs, m) {
         .def("type", &entity::type)
         ;
 
+    py::class_<column_plan>(m, "column_plan")
+        .def(py::init([](std::vector<int32_t> indices,
+                std::vector<py::object> dtypes,
+                std::vector<std::vector<py::ssize_t>> shapes) {
+            if (dtypes.size() != indices.size() ||
+                shapes.size() != indices.size())
+                throw std::invalid_argument("Column plan sizes differ");
+            return column_plan{ indices, dtypes, shapes };
+        }))
+        ;
+
+    // The GIL is released while flecs advances the iterator, so worker
+    // iterators can be consumed from several Python threads at once.
     py::class_<pyflecs::iter>(m, "iter")
-        .def("next", &iter::next)
+        .def("next", &iter::next, py::call_guard<py::gil_scoped_release>())
+        .def("close", &iter::close)
         .def("count", &iter::count)
         .def("term_count", &iter::term_count)
         .def("term", &iter::term)
         .def("get_entity", &iter::get_entity)
+        .def("entities", &wrap_iter_entities,
+            py::return_value_policy::reference)
+        .def("delta_time", &iter::delta_time)
+        .def("event", &iter::event)
+        .def("changed", &iter::changed)
+        .def("skip", &iter::skip)
+        .def("term_owned", &iter::term_owned)
         .def("data", &wrap_iter_term,
             py::return_value_policy::reference)
+        .def("column", &wrap_iter_column)
+        .def("columns", &wrap_iter_columns)
+        .def("table_type", &wrap_iter_table_type)
+        .def("table_column", &wrap_iter_table_column,
+            py::return_value_policy::reference)
+        .def("collect_entities", &wrap_iter_collect_entities)
+        .def("gather", &wrap_iter_gather)
+        .def("scatter", &wrap_iter_scatter)
         ;
 
     py::class_<bulk_entity_builder>(m, "bulk_entity_builder")
-        .def("build", &bulk_entity_builder::build)
+        .def("build", &wrap_bulk_entity_build)
         .def("count", &bulk_entity_builder::count)
         .def("add", &wrap_bulk_entity_add)
+        .def("add", [](bulk_entity_builder* builder, ecs_id_t eid) {
+            builder->add(eid, nullptr);
+        })
+        .def("set_entities", &wrap_bulk_entity_set_entities)
         ;
 
     py::class_<filter>(m, "filter")
-        .def("iter", &filter::iter)
+        .def("iter", &filter::iter, py::keep_alive<0, 1>())
+        .def("worker_iter", &filter::worker_iter, py::keep_alive<0, 1>())
+        .def("close", &filter::close)
+        .def("is_closed", &filter::is_closed)
         .def("term_count", &filter::term_count)
         .def("terms", &filter::terms)
         ;
 
     py::class_<query>(m, "query")
-        .def("iter", &query::iter)
+        .def("iter", &query::iter, py::keep_alive<0, 1>())
+        .def("worker_iter", &query::worker_iter, py::keep_alive<0, 1>())
+        .def("close", &query::close)
+        .def("is_closed", &query::is_closed)
+        .def("changed", &query::changed)
         .def("term_count", &query::term_count)
         .def("terms", &query::terms)
         ;
 
+    py::class_<pyflecs::system>(m, "system")
+        .def("raw", &pyflecs::system::raw)
+        .def("term_count", &pyflecs::system::term_count)
+        .def("terms", &pyflecs::system::terms)
+        ;
+
+    py::class_<pyflecs::observer>(m, "observer")
+        .def("raw", &pyflecs::observer::raw)
+        .def("term_count", &pyflecs::observer::term_count)
+        .def("terms", &pyflecs::observer::terms)
+        ;
+
+    py::class_<pyflecs::snapshot>(m, "snapshot")
+        .def("restore", &pyflecs::snapshot::restore)
+        .def("is_valid", &pyflecs::snapshot::is_valid)
+        ;
+
     py::class_<world>(m, "world")
         .def(py::init<>())
-        .def("entity", py::overload_cast<>(&world::entity))
-        .def("entity", py::overload_cast<std::string>(&world::entity))
-        .def("entity", py::overload_cast<pyflecs::entity&>(&world::entity))
-        .def("bulk_entity_w_id", &world::bulk_entity_w_id)
+        .def("entity", [](world* w) {
+                return w->entity().raw();
+            })
+        .def("entity", [](world* w, std::string name) {
+                return w->entity(name).raw();
+            })
+        .def("entity", [](world* w, ecs_id_t c) {
+                return w->entity(c).raw();
+            })
+        .def("bulk_entity_w_id", &wrap_world_bulk_entity_w_id)
         .def("bulk_entity_builder", &world::bulk_entity_builder)
-        .def("lookup", &world::lookup)
-        .def("lookup_path", &world::lookup_path)
+        .def("lookup", [](world* w, std::string name) {
+                return w->lookup(name).raw();
+            })
+        .def("lookup_path", [](world* w, std::string name) {
+                return w->lookup_path(name).raw();
+            })
         .def("lookup_by_id", &world::lookup_by_id)
-        .def("component", &world::component)
-        .def("create_filter", &world::create_filter)
-        .def("create_query", &world::create_query)
-        .def("create_term_iter", &world::create_term_iter)
+        .def("component", [](world* w, std::string name, size_t size,
+                size_t alignment) {
+                return w->component(name, size, alignment).raw();
+            })
+        // Filters, queries and iterators keep the world alive, so the world
+        // is only finalized once nothing can reach its storage.
+        .def("create_filter", &world::create_filter, py::keep_alive<0, 1>())
+        .def("create_query", &world::create_query, py::keep_alive<0, 1>())
+        .def("create_system", [](world* w, std::string name,
+                std::string expr, bool instanced, std::vector<ecs_term_t> terms,
+                ecs_entity_t phase, bool multi_threaded,
+                py::function callback) {
+            // Pass the iterator by pointer, so Python gets a reference to it
+            // rather than a copy.
+            auto wrapped = [callback](pyflecs::iter& it) {
+                py::gil_scoped_acquire gil;
+                callback(&it);
+            };
+            return w->create_system(name, expr, instanced, terms, phase,
+                multi_threaded, wrapped);
+        })
+        .def("create_observer", [](world* w, std::string name,
+                std::string expr, std::vector<ecs_term_t> terms,
+                std::vector<ecs_entity_t> events, py::function callback) {
+            // Observers fire from inside other operations, so exceptions
+            // are reported as unraisable instead of being propagated.
+            auto wrapped = [callback](pyflecs::iter& it) {
+                py::gil_scoped_acquire gil;
+                try
+                {
+                    callback(&it);
+                }
+                catch (py::error_already_set& e)
+                {
+                    e.discard_as_unraisable("flecs observer");
+                }
+                catch (std::exception& e)
+                {
+                    PyErr_SetString(PyExc_RuntimeError, e.what());
+                    py::error_already_set error;
+                    error.discard_as_unraisable("flecs observer");
+                }
+            };
+            return w->create_observer(name, expr, terms, events, wrapped);
+        })
+        .def("create_term_iter", &world::create_term_iter,
+            py::keep_alive<0, 1>(), py::keep_alive<0, 2>())
+
+        // Snapshots keep the world alive, as they are freed against it
+        .def("snapshot", [](world* w) {
+                return pyflecs::snapshot::take(w->raw());
+            }, py::keep_alive<0, 1>())
+        .def("snapshot", [](world* w, pyflecs::iter& it) {
+                return pyflecs::snapshot::take(w->raw(), it);
+            }, py::keep_alive<0, 1>())
+        // Systems may run on flecs worker threads, which acquire the GIL
+        // only while calling back into Python.
+        .def("progress", &world::progress, py::arg("delta_time") = 0.0f,
+            py::call_guard<py::gil_scoped_release>())
+        .def("set_threads", &world::set_threads)
+        .def("defer_begin", &world::defer_begin)
+        .def("defer_end", &world::defer_end)
+        .def("is_deferred", &world::is_deferred)
+        .def("info", &wrap_world_info)
+        .def("delete_empty_tables", &world::delete_empty_tables)
         .def("set", &wrap_world_set)
-        .def("get", &wrap_world_get, py::return_value_policy::reference)
+        .def("get", &wrap_world_get)
+        .def("get_many", &wrap_world_get_many)
+        .def("entities_exist", &wrap_world_entities_exist)
+        .def("set_many", &wrap_world_set_many)
+        .def("add_many", &wrap_world_add_many)
+        .def("remove_many", &wrap_world_remove_many)
+        .def("delete_many", &wrap_world_delete_many)
+        .def("descendants", &wrap_world_descendants)
+        .def("owners_id", &world::owners_id)
+        .def("remove_all", &world::remove_all)
+        .def("delete_with", &world::delete_with)
+
+        // Operations on entity ids, used by the Python entity handles
+        .def("entity_is_alive", on_id(&entity::is_alive))
+        .def("entity_is_valid", on_id(&entity::is_valid))
+        .def("entity_destruct", on_id(&entity::destruct))
+        .def("entity_name", on_id(&entity::name))
+        .def("entity_add", on_id(&entity::add))
+        .def("entity_set", on_id(&wrap_entity_set))
+        .def("entity_get", [](py::object self, ecs_entity_t e, ecs_id_t c) {
+                entity wrapped(self.cast<world*>()->raw(), e);
+                return wrap_entity_get(&wrapped, c, self);
+            })
+        .def("entity_remove", on_id(&entity::remove))
+        .def("entity_has", on_id(&entity::has))
+        .def("entity_add_pair", on_id(&entity::add_pair))
+        .def("entity_remove_pair", on_id(&entity::remove_pair))
+        .def("entity_has_pair", on_id(&entity::has_pair))
+        .def("entity_set_pair", on_id(&wrap_entity_set_pair))
+        .def("entity_path", on_id(&entity::path))
+        .def("entity_add_child", on_id(&entity::add_child))
+        .def("entity_lookup", [](world* w, ecs_entity_t e, std::string name) {
+                return entity(w->raw(), e).lookup(name).raw();
+            })
+        .def("entity_is_a", on_id(&entity::is_a))
+        .def("entity_type", on_id(&entity::type))
 
         //  function
-        .def("pair", [](world* w, entity* e, entity* other) {
-                return pyflecs::entity(w->raw(), ecs_pair(e->raw(), other->raw()));
+        .def("pair", [](world* w, ecs_entity_t e, ecs_entity_t other) {
+                return ecs_pair(e, other);
             })
 
         // Hooks to special entities
         .def("EcsPrefab", [](world* w) {
-            return pyflecs::entity(w->raw(), EcsPrefab);
+            return EcsPrefab;
             })
         .def("EcsIsA", [](world* w) {
-                return pyflecs::entity(w->raw(), EcsIsA);
+                return EcsIsA;
             })
         .def("EcsChildOf", [](world* w) {
-                return pyflecs::entity(w->raw(), EcsChildOf);
+                return EcsChildOf;
+            })
+        .def("EcsPreUpdate", [](world* w) {
+                return EcsPreUpdate;
+            })
+        .def("EcsOnUpdate", [](world* w) {
+                return EcsOnUpdate;
+            })
+        .def("EcsPostUpdate", [](world* w) {
+                return EcsPostUpdate;
+            })
+        .def("EcsOnAdd", [](world* w) {
+                return EcsOnAdd;
+            })
+        .def("EcsOnRemove", [](world* w) {
+                return EcsOnRemove;
+            })
+        .def("EcsOnSet", [](world* w) {
+                return EcsOnSet;
             })
         ;
 
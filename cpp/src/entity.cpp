@@ -23,6 +23,7 @@
 #include "entity.hpp"
 
 #include <stdexcept>
+#include <string>
 
 using namespace pyflecs;
 
@@ -42,26 +43,41 @@ bulk_entity_builder::bulk_entity_builder(ecs_world_t* pWorld, int32_t count) :
     mpWorld(pWorld),
     mDesc{}
 {
-
+    mDesc.count = count;
 }
 
 void bulk_entity_builder::add(ecs_id_t eid, void* data)
 {
-
+    // The id list is zero terminated, so the last slot stays empty
+    if (mData.size() + 1 >= ECS_MAX_ADD_REMOVE)
+        throw std::length_error("Bulk creation supports at most " +
+            std::to_string(ECS_MAX_ADD_REMOVE - 1) + " ids");
     mDesc.ids[mData.size()] = eid;
     mData.push_back(data);
 }
 
-std::vector<pyflecs::entity> bulk_entity_builder::build()
+void bulk_entity_builder::set_entities(const ecs_entity_t* entities,
+    size_t count)
+{
+    mEntities.assign(entities, entities + count);
+}
+
+const ecs_entity_t* bulk_entity_builder::build()
 {
+    if (!mEntities.empty())
+    {
+        for (auto e : mEntities)
+        {
+            if (ecs_exists(mpWorld, e))
+                throw std::runtime_error("Entity id is already in use");
+        }
+        for (auto e : mEntities)
+            ecs_ensure(mpWorld, e);
+        mDesc.entities = mEntities.data();
+    }
     mDesc.data = mData.data();
     auto result = ecs_bulk_init(mpWorld, &mDesc);
     if (result == nullptr)
         throw std::runtime_error("Error on bulk creation with ID");
-    std::vector<pyflecs::entity> entities;
-    for (int32_t idx = 0; idx < mDesc.count; idx++)
-    {
-        entities.push_back(pyflecs::entity(mpWorld, result[idx]));
-    }
-    return entities;
+    return result;
 }
\ No newline at end of file
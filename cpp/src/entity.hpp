@@ -71,6 +71,11 @@ namespace pyflecs {
             return ecs_is_alive(mpWorld, mRaw);
         }
 
+        bool is_valid() const
+        {
+            return ecs_is_valid(mpWorld, mRaw);
+        }
+
         void destruct()
         {
             ecs_delete(mpWorld, mRaw);
@@ -90,49 +95,55 @@ namespace pyflecs {
             return mRaw;
         }
 
-        void add(entity& c)
+        ecs_world_t* world() const
+        {
+            return mpWorld;
+        }
+
+        void add(ecs_id_t c)
         {
-            ecs_add_id(mpWorld, mRaw, c.raw());
+            ecs_add_id(mpWorld, mRaw, c);
         }
 
-        void set(entity& c, uint32_t size, const void* bytes)
+        void set(ecs_id_t c, uint32_t size, const void* bytes)
         {
-            ecs_set_id(mpWorld, mRaw, c.raw(), size, bytes);
+            ecs_set_id(mpWorld, mRaw, c, size, bytes);
         }
 
-        const void* get(entity& c)
+        const void* get(ecs_id_t c)
         {
-            return ecs_get_id(mpWorld, mRaw, c.raw());
+            return ecs_get_id(mpWorld, mRaw, c);
         }
 
-        void remove(entity& c)
+        void remove(ecs_id_t c)
         {
-            ecs_remove_id(mpWorld, mRaw, c.raw());
+            ecs_remove_id(mpWorld, mRaw, c);
         }
 
-        bool has(entity& c)
+        bool has(ecs_id_t c)
         {
-            return ecs_has_id(mpWorld, mRaw, c.raw());
+            return ecs_has_id(mpWorld, mRaw, c);
         }
 
-        void add_pair(entity& c, entity& e)
+        void add_pair(ecs_entity_t c, ecs_entity_t e)
         {
-            ecs_add_pair(mpWorld, mRaw, c.raw(), e.raw());
+            ecs_add_pair(mpWorld, mRaw, c, e);
         }
 
-        void remove_pair(entity& c, entity& e)
+        void remove_pair(ecs_entity_t c, ecs_entity_t e)
         {
-            ecs_remove_pair(mpWorld, mRaw, c.raw(), e.raw());
+            ecs_remove_pair(mpWorld, mRaw, c, e);
         }
 
-        bool has_pair(entity& c, entity& e)
+        bool has_pair(ecs_entity_t c, ecs_entity_t e)
         {
-            return ecs_has_id(mpWorld, mRaw, ecs_make_pair(c.raw(), e.raw()));
+            return ecs_has_id(mpWorld, mRaw, ecs_make_pair(c, e));
         }
 
-        void set_pair(entity& c, entity& e, uint32_t size, const void* bytes)
+        void set_pair(ecs_entity_t c, ecs_entity_t e, uint32_t size,
+            const void* bytes)
         {
-            ecs_set_id(mpWorld, mRaw, ecs_pair(c.raw(), e.raw()), size, bytes);
+            ecs_set_id(mpWorld, mRaw, ecs_pair(c, e), size, bytes);
         }
 
         uint32_t size() const
@@ -149,9 +160,9 @@ namespace pyflecs {
             return result;
         }
 
-        void add_child(const entity& child)
+        void add_child(ecs_entity_t child)
         {
-            ecs_add_pair(mpWorld, child.raw(), EcsChildOf, mRaw);
+            ecs_add_pair(mpWorld, child, EcsChildOf, mRaw);
         }
 
         entity lookup(std::string name)
@@ -160,9 +171,9 @@ namespace pyflecs {
                 name.c_str()));
         }
 
-        void is_a(const entity& base)
+        void is_a(ecs_entity_t base)
         {
-            ecs_add_pair(mpWorld, mRaw, EcsIsA, base.raw());
+            ecs_add_pair(mpWorld, mRaw, EcsIsA, base);
         }
 
         pyflecs::type type()
@@ -223,7 +234,14 @@ namespace pyflecs {
     public:
         bulk_entity_builder(ecs_world_t* pWorld, int32_t count);
         void add(ecs_id_t eid, void* data);
-        std::vector<pyflecs::entity> build();
+
+        /**
+         * Sets the ids of the entities to create instead of generating new
+         * ones. None of the ids may be in use.
+         */
+        void set_entities(const ecs_entity_t* entities, size_t count);
+
+        const ecs_entity_t* build();
 
         int32_t count() const
         {
@@ -234,5 +252,6 @@ namespace pyflecs {
         ecs_world_t* mpWorld;
         ecs_bulk_desc_t mDesc;
         std::vector<void*> mData;
+        std::vector<ecs_entity_t> mEntities;
     };
 }
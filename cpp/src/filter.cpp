@@ -22,17 +22,46 @@
 
 #include "filter.hpp"
 
+#include <stdexcept>
+
 using namespace pyflecs;
 
 
-filter::filter(ecs_world_t* world, ecs_filter_t f) :
+filter::filter(ecs_world_t* world, const ecs_filter_desc_t& desc) :
     mpWorld(world),
-    mRaw(f)
+    mpRaw(new ecs_filter_t{})
+{
+    if (ecs_filter_init(world, mpRaw.get(), &desc) != 0)
+        throw std::runtime_error("Filter creation failed.");
+}
+
+filter::~filter()
+{
+    this->close();
+}
+
+void filter::close()
 {
+    if (mpRaw != nullptr)
+    {
+        ecs_filter_fini(mpRaw.get());
+        mpRaw.reset();
+    }
+}
 
+const ecs_filter_t* filter::raw() const
+{
+    if (mpRaw == nullptr)
+        throw std::runtime_error("Filter is closed");
+    return mpRaw.get();
 }
 
 pyflecs::iter filter::iter()
 {
-    return pyflecs::iter(ecs_filter_iter(mpWorld, &mRaw));
+    return pyflecs::iter(ecs_filter_iter(mpWorld, raw()));
+}
+
+pyflecs::iter filter::worker_iter(int32_t index, int32_t count)
+{
+    return pyflecs::iter::worker(ecs_filter_iter(mpWorld, raw()), index, count);
 }
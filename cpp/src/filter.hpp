@@ -26,30 +26,52 @@
 #include "entity.hpp"
 #include "iter.hpp"
 
+#include <memory>
 #include <vector>
 
 
 namespace pyflecs {
 
+    /**
+     * Owns a flecs filter. The filter is initialized in place and never
+     * copied, as flecs filters may point into their own storage.
+     */
     class filter final {
     public:
-        filter(ecs_world_t* world, ecs_filter_t filter);
+        filter(ecs_world_t* world, const ecs_filter_desc_t& desc);
+        filter(filter&& other) = default;
+        filter(const filter&) = delete;
+        ~filter();
 
         pyflecs::iter iter();
+        pyflecs::iter worker_iter(int32_t index, int32_t count);
+
+        /**
+         * Frees the filter. Iterators created from it must not be used
+         * afterwards, and creating new ones throws.
+         */
+        void close();
+
+        bool is_closed() const
+        {
+            return mpRaw == nullptr;
+        }
 
         int32_t term_count() const
         {
-            return mRaw.term_count;
+            return raw()->term_count;
         }
 
         const ecs_term_t& terms(size_t idx) const
         {
-            assert(idx < mRaw.term_count);
-            return mRaw.terms[idx];
+            assert(idx < raw()->term_count);
+            return raw()->terms[idx];
         }
 
     private:
+        const ecs_filter_t* raw() const;
+
         ecs_world_t* mpWorld;
-        ecs_filter_t mRaw;
+        std::unique_ptr<ecs_filter_t> mpRaw;
     };
 }
\ No newline at end of file
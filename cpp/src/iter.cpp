@@ -21,22 +21,229 @@
  */
 
 #include "filter.hpp"
+#include <cstring>
 #include <iostream>
+#include <stdexcept>
 
 using namespace pyflecs;
 
-iter::iter(ecs_iter_t iter) :
-    mRaw(iter)
+iter::iter(ecs_iter_t iter, bool iterable) :
+    mRaw(iter),
+    mDone(!iterable),
+    mpQuery(nullptr)
 {
 
 }
 
+iter::iter(ecs_iter_t iter, std::shared_ptr<ecs_iter_t> source) :
+    mRaw(iter),
+    mDone(false),
+    mpSource(source),
+    mpQuery(nullptr)
+{
+
+}
+
+iter::iter(ecs_iter_t iter, ecs_query_t* query) :
+    mRaw(iter),
+    mDone(false),
+    mpQuery(query)
+{
+
+}
+
+iter::iter(iter&& other) noexcept :
+    mRaw(other.mRaw),
+    mDone(other.mDone),
+    mpSource(std::move(other.mpSource)),
+    mpQuery(other.mpQuery)
+{
+    // Only one of the two may finalize the flecs iterator.
+    other.mDone = true;
+}
+
+iter::~iter()
+{
+    this->close();
+}
+
+void iter::close()
+{
+    if (!mDone)
+    {
+        ecs_iter_fini(&mRaw);
+        mDone = true;
+    }
+}
+
+ecs_iter_t* iter::consume()
+{
+    if (mDone)
+        throw std::runtime_error("Iterator has already been used");
+
+    // flecs finalizes the iterator once the operation exhausts it.
+    mDone = true;
+    return &mRaw;
+}
+
+pyflecs::iter iter::worker(ecs_iter_t source, int32_t index, int32_t count)
+{
+    if (count <= 0 || index < 0 || index >= count)
+        throw std::out_of_range("Invalid worker index");
+    auto chain = std::make_shared<ecs_iter_t>(source);
+    return pyflecs::iter(ecs_worker_iter(chain.get(), index, count), chain);
+}
+
 bool iter::next()
 {
-    return ecs_iter_next(&mRaw);
+    if (mDone)
+        return false;
+
+    // flecs finalizes the iterator itself once it is exhausted.
+    if (!ecs_iter_next(&mRaw))
+        mDone = true;
+    return !mDone;
+}
+
+bool iter::changed()
+{
+    if (mpQuery == nullptr)
+        throw std::runtime_error("Change detection requires a query");
+    return ecs_query_changed(mpQuery, &mRaw);
+}
+
+void iter::skip()
+{
+    if (mpQuery == nullptr)
+        throw std::runtime_error("Skipping tables requires a query");
+    ecs_query_skip(&mRaw);
 }
 
 void* iter::get_term_data(entity& e, int32_t idx)
+{
+    return this->term_data(idx);
+}
+
+void* iter::term_data(int32_t idx)
 {
     return ecs_term_w_size(&mRaw, this->term_size(idx), idx);
 }
+
+std::vector<ecs_id_t> iter::table_type() const
+{
+    std::vector<ecs_id_t> result;
+    if (mRaw.type != nullptr)
+    {
+        auto ids = ecs_vector_first(mRaw.type, ecs_id_t);
+        result.assign(ids, ids + ecs_vector_count(mRaw.type));
+    }
+    return result;
+}
+
+const void* iter::table_column(ecs_id_t id, size_t& size) const
+{
+    size = 0;
+    int32_t index = ecs_iter_column_index(&mRaw, id);
+    if (index < 0)
+        return nullptr;
+    size = ecs_iter_column_size(&mRaw, index);
+    if (size == 0)
+        return nullptr;
+    return ecs_iter_column_w_size(&mRaw, size, index);
+}
+
+std::vector<table_chunk> iter::chunks(int32_t idx)
+{
+    std::vector<table_chunk> result;
+    while (this->next())
+    {
+        table_chunk chunk;
+        chunk.size = this->term_size(idx);
+        chunk.data = reinterpret_cast<const uint8_t*>(
+            ecs_term_w_size(&mRaw, chunk.size, idx));
+        chunk.entities = mRaw.entities;
+        chunk.count = mRaw.count;
+        chunk.owned = this->term_owned(idx);
+        result.push_back(chunk);
+    }
+    return result;
+}
+
+ecs_id_t iter::plain_term_id() const
+{
+    if (mRaw.term_count != 1 || mRaw.terms == nullptr)
+        return 0;
+    const ecs_term_t& term = mRaw.terms[0];
+    if (term.oper != EcsAnd || term.subj.entity != EcsThis ||
+        ecs_id_is_wildcard(term.id))
+        return 0;
+    return term.id;
+}
+
+std::vector<ecs_entity_t> iter::collect_entities()
+{
+    std::vector<ecs_entity_t> result;
+    while (this->next())
+        result.insert(result.end(), mRaw.entities,
+            mRaw.entities + mRaw.count);
+    return result;
+}
+
+void iter::gather(const std::vector<table_chunk>& chunks, uint8_t* dst,
+    ecs_entity_t* entities)
+{
+    for (const auto& chunk : chunks)
+    {
+        size_t nbytes = chunk.count * chunk.size;
+        if (chunk.data == nullptr)
+        {
+            std::memset(dst, 0, nbytes);
+        }
+        else if (chunk.owned)
+        {
+            std::memcpy(dst, chunk.data, nbytes);
+        }
+        else
+        {
+            for (int32_t row = 0; row < chunk.count; row++)
+                std::memcpy(dst + row * chunk.size, chunk.data, chunk.size);
+        }
+        dst += nbytes;
+
+        if (entities != nullptr)
+        {
+            std::memcpy(entities, chunk.entities,
+                chunk.count * sizeof(ecs_entity_t));
+            entities += chunk.count;
+        }
+    }
+}
+
+bool iter::scatter(const std::vector<table_chunk>& chunks, const uint8_t* src,
+    const ecs_entity_t* entities)
+{
+    if (entities != nullptr)
+    {
+        // Validate the whole layout before writing anything.
+        const ecs_entity_t* expected = entities;
+        for (const auto& chunk : chunks)
+        {
+            if (std::memcmp(expected, chunk.entities,
+                chunk.count * sizeof(ecs_entity_t)) != 0)
+                return false;
+            expected += chunk.count;
+        }
+    }
+
+    for (const auto& chunk : chunks)
+    {
+        size_t nbytes = chunk.count * chunk.size;
+        if (chunk.data != nullptr)
+        {
+            auto dst = const_cast<uint8_t*>(chunk.data);
+            std::memcpy(dst, src, nbytes);
+        }
+        src += nbytes;
+    }
+    return true;
+}
@@ -25,15 +25,55 @@
 #include "flecs.h"
 #include "entity.hpp"
 
+#include <memory>
+#include <vector>
+
 
 namespace pyflecs {
 
+    /**
+     * Describes the column of a single term for one matched table.
+     */
+    struct table_chunk {
+        const uint8_t* data;
+        const ecs_entity_t* entities;
+        int32_t count;
+        size_t size;
+        bool owned;
+    };
+
     class iter final {
     public:
-        iter(ecs_iter_t iter);
+        iter(ecs_iter_t iter, bool iterable = true);
+        iter(ecs_iter_t iter, std::shared_ptr<ecs_iter_t> source);
+        iter(ecs_iter_t iter, ecs_query_t* query);
+        iter(iter&& other) noexcept;
+        iter(const iter&) = delete;
+        ~iter();
+
+        /**
+         * Creates an iterator over the subset of tables assigned to the
+         * worker with the given index, out of count workers in total.
+         */
+        static pyflecs::iter worker(ecs_iter_t source, int32_t index,
+            int32_t count);
 
         bool next();
+
+        /**
+         * Releases the resources of an iterator that was not iterated to
+         * completion. Called automatically when the iterator is destroyed.
+         */
+        void close();
+
+        /**
+         * Hands the iterator to a flecs operation which iterates it to
+         * completion, such as taking a snapshot.
+         */
+        ecs_iter_t* consume();
+
         void* get_term_data(entity& e, int32_t idx);
+        void* term_data(int32_t idx);
         int32_t count()
         {
             return mRaw.count;
@@ -44,6 +84,11 @@ namespace pyflecs {
             return mRaw.entities[idx];
         }
 
+        const ecs_entity_t* entities() const
+        {
+            return mRaw.entities;
+        }
+
         int32_t term_count()
         {
             return mRaw.term_count;
@@ -64,8 +109,88 @@ namespace pyflecs {
             return ecs_term_is_owned(&mRaw, idx);
         }
 
+        float delta_time() const
+        {
+            return mRaw.delta_time;
+        }
+
+        ecs_entity_t event() const
+        {
+            return mRaw.event;
+        }
+
+        /**
+         * Returns the ids of the table the iterator is positioned on,
+         * including those not matched by any term.
+         */
+        std::vector<ecs_id_t> table_type() const;
+
+        /**
+         * Returns the storage of the current table for the id, or null if the
+         * table stores no data for it. size receives the element size.
+         */
+        const void* table_column(ecs_id_t id, size_t& size) const;
+
+        /**
+         * Returns whether the current table changed since the query last
+         * iterated it. Only available when iterating a query.
+         */
+        bool changed();
+
+        /**
+         * Skips the current table, so it is not marked as modified by the
+         * query's write terms. Only available when iterating a query.
+         */
+        void skip();
+
+        /**
+         * Drains the iterator, recording the column of term idx for every
+         * matched table. The pointers stay valid until the world is modified.
+         */
+        std::vector<table_chunk> chunks(int32_t idx);
+
+        /**
+         * Returns the id of the only term when it is a plain id term, which
+         * matches the entities having a non wildcard id, or 0 otherwise.
+         */
+        ecs_id_t plain_term_id() const;
+
+        /**
+         * Drains the iterator, returning the ids of the entities of every
+         * matched table in iteration order.
+         */
+        std::vector<ecs_entity_t> collect_entities();
+
+        /**
+         * Copies the chunks into dst in iteration order, along with the entity
+         * ids if entities is not null. Terms shared from a base entity are
+         * repeated for each row and missing optional terms are zeroed.
+         */
+        static void gather(const std::vector<table_chunk>& chunks,
+            uint8_t* dst, ecs_entity_t* entities);
+
+        /**
+         * Copies src back into the chunks in iteration order. If entities is
+         * not null, each table must still hold exactly those entities,
+         * otherwise nothing is written and false is returned.
+         */
+        static bool scatter(const std::vector<table_chunk>& chunks,
+            const uint8_t* src, const ecs_entity_t* entities);
+
     private:
         ecs_iter_t mRaw;
 
+        // Whether the iterator may no longer be advanced or finalized: it was
+        // iterated to completion or closed, or it was handed to a system or
+        // observer callback, where flecs positions and advances it itself.
+        bool mDone;
+
+        // Worker iterators keep a pointer to the iterator they are chained
+        // to, which must stay alive at a stable address.
+        std::shared_ptr<ecs_iter_t> mpSource;
+
+        // The query being iterated, if any, used for change detection.
+        ecs_query_t* mpQuery;
+
     };
 }
\ No newline at end of file
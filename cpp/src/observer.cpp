@@ -0,0 +1,71 @@
+/* Copyright (c) 2022 Pixel Flux
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining
+ * a copy of this software and associated documentation files (the
+ * "Software"), to deal in the Software without restriction, including
+ * without limitation the rights to use, copy, modify, merge, publish,
+ * distribute, sublicense, and/or sell copies of the Software, and to
+ * permit persons to whom the Software is furnished to do so, subject to
+ * the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+ * IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+ * CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+ * TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+ * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#include "observer.hpp"
+
+#include <iostream>
+
+using namespace pyflecs;
+
+
+void pyflecs::observer_action(ecs_iter_t* it)
+{
+    auto ctx = reinterpret_cast<observer_context*>(it->binding_ctx);
+
+    // Observers run inside arbitrary flecs operations, so errors cannot be
+    // propagated to the caller. The bindings report them before they get
+    // here; anything else is written to stderr rather than unwinding through
+    // flecs.
+    try
+    {
+        pyflecs::iter wrapped(*it, false);
+        ctx->callback(wrapped);
+    }
+    catch (std::exception& e)
+    {
+        std::cerr << "Error in flecs observer: " << e.what() << std::endl;
+    }
+    catch (...)
+    {
+        std::cerr << "Unknown error in flecs observer" << std::endl;
+    }
+}
+
+void pyflecs::observer_context_free(void* ctx)
+{
+    delete reinterpret_cast<observer_context*>(ctx);
+}
+
+observer::observer(ecs_world_t* world, ecs_entity_t e,
+    std::unique_ptr<ecs_filter_t> filter) :
+    mpWorld(world),
+    mRaw(e),
+    mpFilter(std::move(filter))
+{
+
+}
+
+observer::~observer()
+{
+    if (mpFilter != nullptr)
+        ecs_filter_fini(mpFilter.get());
+}
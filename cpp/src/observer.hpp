@@ -0,0 +1,88 @@
+/* Copyright (c) 2022 Pixel Flux
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining
+ * a copy of this software and associated documentation files (the
+ * "Software"), to deal in the Software without restriction, including
+ * without limitation the rights to use, copy, modify, merge, publish,
+ * distribute, sublicense, and/or sell copies of the Software, and to
+ * permit persons to whom the Software is furnished to do so, subject to
+ * the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+ * IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+ * CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+ * TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+ * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#pragma once
+
+#include "flecs.h"
+#include "iter.hpp"
+
+#include <functional>
+#include <memory>
+
+
+namespace pyflecs {
+
+    using observer_callback = std::function<void(pyflecs::iter&)>;
+
+    /**
+     * State attached to an observer through its binding context. The
+     * callback is owned by flecs and released when the observer is deleted.
+     */
+    struct observer_context {
+        observer_callback callback;
+    };
+
+    /**
+     * The action registered with flecs for every Python observer. Invoked
+     * once per table batch for each matching event.
+     */
+    void observer_action(ecs_iter_t* it);
+
+    /**
+     * Frees an observer_context once flecs deletes the observer.
+     */
+    void observer_context_free(void* ctx);
+
+    /**
+     * Wraps a flecs observer. The terms are parsed into a separate filter so
+     * the components of each term can be resolved.
+     */
+    class observer final {
+    public:
+        observer(ecs_world_t* world, ecs_entity_t e,
+            std::unique_ptr<ecs_filter_t> filter);
+        observer(observer&& other) = default;
+        observer(const observer&) = delete;
+        ~observer();
+
+        ecs_entity_t raw() const
+        {
+            return mRaw;
+        }
+
+        int32_t term_count() const
+        {
+            return mpFilter->term_count;
+        }
+
+        const ecs_term_t& terms(size_t idx) const
+        {
+            assert(idx < mpFilter->term_count);
+            return mpFilter->terms[idx];
+        }
+
+    private:
+        ecs_world_t* mpWorld;
+        ecs_entity_t mRaw;
+        std::unique_ptr<ecs_filter_t> mpFilter;
+    };
+}
@@ -22,6 +22,8 @@
 
 #include "query.hpp"
 
+#include <stdexcept>
+
 using namespace pyflecs;
 
 
@@ -32,7 +34,46 @@ query::query(ecs_world_t* world, ecs_query_t* q) :
 
 }
 
+query::query(query&& other) noexcept :
+    mpWorld(other.mpWorld),
+    mpRaw(other.mpRaw)
+{
+    other.mpRaw = nullptr;
+}
+
+query::~query()
+{
+    this->close();
+}
+
+void query::close()
+{
+    if (mpRaw != nullptr)
+    {
+        ecs_query_fini(mpRaw);
+        mpRaw = nullptr;
+    }
+}
+
+ecs_query_t* query::raw() const
+{
+    if (mpRaw == nullptr)
+        throw std::runtime_error("Query is closed");
+    return mpRaw;
+}
+
 pyflecs::iter query::iter()
 {
-    return pyflecs::iter(ecs_query_iter(mpWorld, mpRaw));
+    auto q = raw();
+    return pyflecs::iter(ecs_query_iter(mpWorld, q), q);
+}
+
+pyflecs::iter query::worker_iter(int32_t index, int32_t count)
+{
+    return pyflecs::iter::worker(ecs_query_iter(mpWorld, raw()), index, count);
+}
+
+bool query::changed()
+{
+    return ecs_query_changed(raw(), nullptr);
 }
@@ -33,7 +33,29 @@ namespace pyflecs {
     class query final {
     public:
         query(ecs_world_t* world, ecs_query_t* query);
+        query(query&& other) noexcept;
+        query(const query&) = delete;
+        ~query();
+
         pyflecs::iter iter();
+        pyflecs::iter worker_iter(int32_t index, int32_t count);
+
+        /**
+         * Returns whether any matched table changed since the query was last
+         * iterated.
+         */
+        bool changed();
+
+        /**
+         * Frees the query. Iterators created from it must not be used
+         * afterwards, and creating new ones throws.
+         */
+        void close();
+
+        bool is_closed() const
+        {
+            return mpRaw == nullptr;
+        }
 
         int32_t term_count() const
         {
@@ -50,9 +72,11 @@ namespace pyflecs {
     private:
         const ecs_filter_t* filter() const
         {
-            return ecs_query_get_filter(mpRaw);
+            return ecs_query_get_filter(raw());
         }
 
+        ecs_query_t* raw() const;
+
         ecs_world_t* mpWorld;
         ecs_query_t* mpRaw;
     };
@@ -0,0 +1,61 @@
+/* Copyright (c) 2022 Pixel Flux
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining
+ * a copy of this software and associated documentation files (the
+ * "Software"), to deal in the Software without restriction, including
+ * without limitation the rights to use, copy, modify, merge, publish,
+ * distribute, sublicense, and/or sell copies of the Software, and to
+ * permit persons to whom the Software is furnished to do so, subject to
+ * the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+ * IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+ * CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+ * TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+ * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#include "snapshot.hpp"
+
+#include <stdexcept>
+
+using namespace pyflecs;
+
+
+snapshot::snapshot(ecs_world_t* world, ecs_snapshot_t* raw) :
+    mpWorld(world),
+    mpRaw(raw)
+{
+
+}
+
+snapshot::~snapshot()
+{
+    if (mpRaw != nullptr)
+        ecs_snapshot_free(mpRaw);
+}
+
+snapshot* snapshot::take(ecs_world_t* world)
+{
+    return new snapshot(world, ecs_snapshot_take(world));
+}
+
+snapshot* snapshot::take(ecs_world_t* world, pyflecs::iter& it)
+{
+    return new snapshot(world, ecs_snapshot_take_w_iter(it.consume()));
+}
+
+void snapshot::restore()
+{
+    if (mpRaw == nullptr)
+        throw std::runtime_error("Snapshot has already been restored");
+
+    // Restoring hands the snapshot's storage back to the world.
+    ecs_snapshot_restore(mpWorld, mpRaw);
+    mpRaw = nullptr;
+}
@@ -0,0 +1,58 @@
+/* Copyright (c) 2022 Pixel Flux
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining
+ * a copy of this software and associated documentation files (the
+ * "Software"), to deal in the Software without restriction, including
+ * without limitation the rights to use, copy, modify, merge, publish,
+ * distribute, sublicense, and/or sell copies of the Software, and to
+ * permit persons to whom the Software is furnished to do so, subject to
+ * the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+ * IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+ * CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+ * TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+ * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#pragma once
+
+#include "flecs.h"
+#include "iter.hpp"
+
+
+namespace pyflecs {
+
+    /**
+     * Owns a flecs snapshot. A snapshot can only be restored once, as its
+     * data is moved back into the world; otherwise it is freed on
+     * destruction.
+     */
+    class snapshot final {
+    public:
+        snapshot(ecs_world_t* world, ecs_snapshot_t* raw);
+        ~snapshot();
+
+        snapshot(const snapshot&) = delete;
+        snapshot& operator=(const snapshot&) = delete;
+
+        static snapshot* take(ecs_world_t* world);
+        static snapshot* take(ecs_world_t* world, pyflecs::iter& it);
+
+        void restore();
+
+        bool is_valid() const
+        {
+            return mpRaw != nullptr;
+        }
+
+    private:
+        ecs_world_t* mpWorld;
+        ecs_snapshot_t* mpRaw;
+    };
+}
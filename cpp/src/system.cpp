@@ -0,0 +1,58 @@
+/* Copyright (c) 2022 Pixel Flux
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining
+ * a copy of this software and associated documentation files (the
+ * "Software"), to deal in the Software without restriction, including
+ * without limitation the rights to use, copy, modify, merge, publish,
+ * distribute, sublicense, and/or sell copies of the Software, and to
+ * permit persons to whom the Software is furnished to do so, subject to
+ * the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+ * IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+ * CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+ * TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+ * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#include "system.hpp"
+
+using namespace pyflecs;
+
+
+void pyflecs::system_action(ecs_iter_t* it)
+{
+    auto ctx = reinterpret_cast<system_context*>(it->binding_ctx);
+
+    // Once a callback has failed, skip the rest of the frame so the error
+    // can be raised as soon as ecs_progress returns.
+    if (ctx->error->failed())
+        return;
+
+    try
+    {
+        pyflecs::iter wrapped(*it, false);
+        ctx->callback(wrapped);
+    }
+    catch (...)
+    {
+        ctx->error->set(std::current_exception());
+    }
+}
+
+void pyflecs::system_context_free(void* ctx)
+{
+    delete reinterpret_cast<system_context*>(ctx);
+}
+
+system::system(ecs_world_t* world, ecs_entity_t e) :
+    mpWorld(world),
+    mRaw(e)
+{
+
+}
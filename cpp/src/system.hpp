@@ -0,0 +1,120 @@
+/* Copyright (c) 2022 Pixel Flux
+ *
+ * Permission is hereby granted, free of charge, to any person obtaining
+ * a copy of this software and associated documentation files (the
+ * "Software"), to deal in the Software without restriction, including
+ * without limitation the rights to use, copy, modify, merge, publish,
+ * distribute, sublicense, and/or sell copies of the Software, and to
+ * permit persons to whom the Software is furnished to do so, subject to
+ * the following conditions:
+ *
+ * The above copyright notice and this permission notice shall be
+ * included in all copies or substantial portions of the Software.
+ *
+ * THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+ * EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+ * MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+ * IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+ * CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+ * TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+ * SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+ */
+
+#pragma once
+
+#include "flecs.h"
+#include "iter.hpp"
+
+#include <exception>
+#include <functional>
+#include <mutex>
+
+
+namespace pyflecs {
+
+    using system_callback = std::function<void(pyflecs::iter&)>;
+
+    /**
+     * Stores the first exception raised by a system callback. Systems may run
+     * on worker threads, so access is guarded by a mutex.
+     */
+    struct system_error {
+        std::mutex mutex;
+        std::exception_ptr error;
+
+        bool failed()
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            return static_cast<bool>(error);
+        }
+
+        void set(std::exception_ptr e)
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            if (!error)
+                error = e;
+        }
+
+        std::exception_ptr take()
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            auto result = error;
+            error = nullptr;
+            return result;
+        }
+    };
+
+    /**
+     * State attached to a system through its binding context. The callback
+     * is owned by flecs and released when the system is deleted.
+     */
+    struct system_context {
+        system_callback callback;
+        system_error* error;
+    };
+
+    /**
+     * The action registered with flecs for every Python system. Invoked once
+     * per matched table when the world progresses.
+     */
+    void system_action(ecs_iter_t* it);
+
+    /**
+     * Frees a system_context once flecs deletes the system.
+     */
+    void system_context_free(void* ctx);
+
+    /**
+     * Wraps a flecs system.
+     */
+    class system final {
+    public:
+        system(ecs_world_t* world, ecs_entity_t e);
+
+        ecs_entity_t raw() const
+        {
+            return mRaw;
+        }
+
+        int32_t term_count() const
+        {
+            return filter()->term_count;
+        }
+
+        const ecs_term_t& terms(size_t idx) const
+        {
+            auto f = filter();
+            assert(idx < f->term_count);
+            return f->terms[idx];
+        }
+
+    private:
+        const ecs_filter_t* filter() const
+        {
+            return ecs_query_get_filter(ecs_system_get_query(mpWorld, mRaw));
+        }
+
+        ecs_world_t* mpWorld;
+        ecs_entity_t mRaw;
+    };
+}
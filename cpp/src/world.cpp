@@ -22,7 +22,12 @@
 
 #include "world.hpp"
 
+#include <algorithm>
+#include <cstring>
+#include <functional>
 #include <stdexcept>
+#include <string>
+#include <utility>
 
 using namespace pyflecs;
 
@@ -50,23 +55,17 @@ pyflecs::entity world::entity(std::string name)
     return pyflecs::entity(mpRaw, ecs_entity_init(mpRaw, &desc));
 }
 
-pyflecs::entity world::entity(pyflecs::entity &c)
+pyflecs::entity world::entity(ecs_id_t c)
 {
-    return pyflecs::entity(mpRaw, ecs_new_w_id(mpRaw, c.raw()));
+    return pyflecs::entity(mpRaw, ecs_new_w_id(mpRaw, c));
 }
 
-std::vector<pyflecs::entity> world::bulk_entity_w_id(ecs_id_t eid, 
-    int32_t count)
+const ecs_entity_t* world::bulk_entity_w_id(ecs_id_t eid, int32_t count)
 {
     auto result = ecs_bulk_new_w_id(mpRaw, eid, count);
     if (result == nullptr)
         throw std::runtime_error("Error on bulk creation with ID");
-    std::vector<pyflecs::entity> entities;
-    for (int32_t idx = 0; idx < count; idx++)
-    {
-        entities.push_back(pyflecs::entity(mpRaw, result[idx]));
-    }
-    return entities;
+    return result;
 }
 
 pyflecs::bulk_entity_builder world::bulk_entity_builder(int32_t count)
@@ -104,11 +103,13 @@ pyflecs::entity world::component(std::string name, size_t size,
     return pyflecs::entity(mpRaw, component_id);
 }
 
-pyflecs::filter world::create_filter(std::string name, 
-    std::string expr, bool instanced, std::vector<ecs_term_t> terms)
+/**
+ * Populates the filter descriptor shared by filters, queries and systems.
+ */
+static void init_filter_desc(ecs_filter_desc_t& desc, const std::string& name,
+    const std::string& expr, bool instanced,
+    const std::vector<ecs_term_t>& terms)
 {
-    ecs_filter_t f;
-    ecs_filter_desc_t desc{};
     desc.name = name.c_str();
     desc.expr = expr.c_str();
     desc.instanced = instanced;
@@ -123,39 +124,245 @@ pyflecs::filter world::create_filter(std::string name,
         {
             desc.terms[idx] = terms[idx];
         }
-    }    
-    auto result = ecs_filter_init(mpRaw, &f, &desc);
-    if (result != 0)
-    {
-        throw std::runtime_error("Filter creation failed.");
     }
+}
 
-    return pyflecs::filter(mpRaw, f);
+pyflecs::filter world::create_filter(std::string name, 
+    std::string expr, bool instanced, std::vector<ecs_term_t> terms)
+{
+    ecs_filter_desc_t desc{};
+    init_filter_desc(desc, name, expr, instanced, terms);
+    return pyflecs::filter(mpRaw, desc);
 }
 
 pyflecs::query world::create_query(std::string name,
     std::string expr, bool instanced, std::vector<ecs_term_t> terms)
 {
     ecs_query_desc_t desc{};
-    desc.filter.name = name.c_str();
-    desc.filter.expr = expr.c_str();
-    desc.filter.instanced = instanced;
+    init_filter_desc(desc.filter, name, expr, instanced, terms);
 
-    if (terms.size() > ECS_TERM_DESC_CACHE_SIZE)
+    auto q = ecs_query_init(mpRaw, &desc);
+    if (q == nullptr)
     {
-        // TODO
+        throw std::runtime_error("Query creation failed.");
     }
-    else
+    return pyflecs::query(mpRaw, q);
+}
+
+pyflecs::system world::create_system(std::string name, std::string expr,
+    bool instanced, std::vector<ecs_term_t> terms, ecs_entity_t phase,
+    bool multi_threaded, pyflecs::system_callback callback)
+{
+    ecs_system_desc_t desc{};
+    desc.entity.name = name.empty() ? nullptr : name.c_str();
+    desc.entity.add[0] = phase ? phase : EcsOnUpdate;
+    init_filter_desc(desc.query.filter, name, expr, instanced, terms);
+    auto ctx = new system_context{ callback, &mError };
+    desc.callback = pyflecs::system_action;
+    desc.binding_ctx = ctx;
+    desc.binding_ctx_free = pyflecs::system_context_free;
+    desc.multi_threaded = multi_threaded;
+
+    auto e = ecs_system_init(mpRaw, &desc);
+    if (e == 0)
     {
-        for (auto idx = 0; idx < terms.size(); idx++)
+        delete ctx;
+        throw std::runtime_error("System creation failed.");
+    }
+    return pyflecs::system(mpRaw, e);
+}
+
+pyflecs::observer world::create_observer(std::string name, std::string expr,
+    std::vector<ecs_term_t> terms, std::vector<ecs_entity_t> events,
+    pyflecs::observer_callback callback)
+{
+    ecs_observer_desc_t desc{};
+    constexpr size_t max_events = sizeof(desc.events) / sizeof(desc.events[0]);
+    if (events.empty() || events.size() > max_events)
+        throw std::invalid_argument("Invalid number of observer events");
+
+    desc.entity.name = name.empty() ? nullptr : name.c_str();
+    init_filter_desc(desc.filter, name, expr, false, terms);
+    for (size_t idx = 0; idx < events.size(); idx++)
+    {
+        desc.events[idx] = events[idx];
+    }
+
+    // Parse the terms separately, so the components can be looked up. The
+    // filter is initialized in place, as it may point into itself.
+    auto f = std::make_unique<ecs_filter_t>();
+    if (ecs_filter_init(mpRaw, f.get(), &desc.filter) != 0)
+    {
+        throw std::runtime_error("Observer creation failed.");
+    }
+
+    auto ctx = new observer_context{ callback };
+    desc.callback = pyflecs::observer_action;
+    desc.binding_ctx = ctx;
+    desc.binding_ctx_free = pyflecs::observer_context_free;
+
+    auto e = ecs_observer_init(mpRaw, &desc);
+    if (e == 0)
+    {
+        delete ctx;
+        ecs_filter_fini(f.get());
+        throw std::runtime_error("Observer creation failed.");
+    }
+    return pyflecs::observer(mpRaw, e, std::move(f));
+}
+
+int32_t world::delete_empty_tables()
+{
+    // flecs ages empty tables by one generation per call and only deletes
+    // those older than delete_generation, so the first call marks the tables
+    // that are empty now and the second deletes them.
+    ecs_delete_empty_tables(mpRaw, 0, 0, 1, 0, 0);
+    return ecs_delete_empty_tables(mpRaw, 0, 0, 1, 0, 0);
+}
+
+size_t world::get_many(ecs_id_t c, size_t size, const ecs_entity_t* ids,
+    size_t count, uint8_t* dst, bool* found)
+{
+    size_t result = 0;
+    for (size_t row = 0; row < count; row++)
+    {
+        const void* src = nullptr;
+        if (ids[row] != 0 && ecs_is_alive(mpRaw, ids[row]))
+            src = ecs_get_id(mpRaw, ids[row], c);
+
+        uint8_t* out = dst + row * size;
+        if (src != nullptr)
         {
-            desc.filter.terms[idx] = terms[idx];
+            std::memcpy(out, src, size);
+            result++;
         }
-    }    
-    auto q = ecs_query_init(mpRaw, &desc);
-    if (q == nullptr)
+        else
+        {
+            std::memset(out, 0, size);
+        }
+        found[row] = src != nullptr;
+    }
+    return result;
+}
+
+/**
+ * Returns the positions of the ids ordered by the table holding each entity,
+ * keeping the given order within a table. Every id is checked to be alive
+ * first, so a batch is either applied to all entities or to none.
+ */
+static std::vector<size_t> table_order(ecs_world_t* world,
+    const ecs_entity_t* ids, size_t count)
+{
+    std::vector<std::pair<ecs_table_t*, size_t>> keys(count);
+    for (size_t row = 0; row < count; row++)
     {
-        throw std::runtime_error("Query creation failed.");
+        if (ids[row] == 0 || !ecs_is_alive(world, ids[row]))
+            throw std::runtime_error("Entity " + std::to_string(ids[row]) +
+                " is not alive");
+        keys[row] = { ecs_get_table(world, ids[row]), row };
     }
-    return pyflecs::query(mpRaw, q);
-}
\ No newline at end of file
+    std::stable_sort(keys.begin(), keys.end(),
+        [](const auto& a, const auto& b) {
+            return std::less<ecs_table_t*>()(a.first, b.first);
+        });
+
+    std::vector<size_t> result(count);
+    for (size_t row = 0; row < count; row++)
+        result[row] = keys[row].second;
+    return result;
+}
+
+void world::set_many(ecs_id_t c, size_t size, const ecs_entity_t* ids,
+    size_t count, const uint8_t* data)
+{
+    for (size_t row : table_order(mpRaw, ids, count))
+        ecs_set_id(mpRaw, ids[row], c, size, data + row * size);
+}
+
+void world::add_many(ecs_id_t c, const ecs_entity_t* ids, size_t count)
+{
+    for (size_t row : table_order(mpRaw, ids, count))
+        ecs_add_id(mpRaw, ids[row], c);
+}
+
+void world::remove_many(ecs_id_t c, const ecs_entity_t* ids, size_t count)
+{
+    for (size_t row : table_order(mpRaw, ids, count))
+        ecs_remove_id(mpRaw, ids[row], c);
+}
+
+void world::delete_many(const ecs_entity_t* ids, size_t count)
+{
+    for (size_t row : table_order(mpRaw, ids, count))
+    {
+        if (ecs_is_alive(mpRaw, ids[row]))
+            ecs_delete(mpRaw, ids[row]);
+    }
+}
+
+std::vector<ecs_entity_t> world::descendants(const ecs_entity_t* ids,
+    size_t count)
+{
+    std::vector<ecs_entity_t> result;
+    std::vector<ecs_entity_t> parents(ids, ids + count);
+    while (!parents.empty())
+    {
+        ecs_entity_t parent = parents.back();
+        parents.pop_back();
+
+        // Most entities have no children, so skip building a filter for them
+        ecs_id_t child_of = ecs_pair(EcsChildOf, parent);
+        if (!ecs_is_alive(mpRaw, parent) || ecs_count_id(mpRaw, child_of) == 0)
+            continue;
+
+        ecs_filter_desc_t desc{};
+        desc.terms[0].id = child_of;
+        desc.expr = "?Prefab, ?Disabled";
+        pyflecs::filter children(mpRaw, desc);
+        auto found = children.iter().collect_entities();
+        result.insert(result.end(), found.begin(), found.end());
+        parents.insert(parents.end(), found.begin(), found.end());
+    }
+    return result;
+}
+
+ecs_id_t world::owners_id(pyflecs::iter& it)
+{
+    ecs_id_t id = it.plain_term_id();
+    if (id == 0)
+        return 0;
+
+    // Entities inheriting the id are matched without owning it
+    int64_t matched = 0;
+    while (it.next())
+    {
+        if (!it.term_owned(1))
+        {
+            it.close();
+            return 0;
+        }
+        matched += it.count();
+    }
+
+    // Prefab and disabled entities own the id without being matched
+    ecs_filter_desc_t desc{};
+    desc.terms[0].id = id;
+    desc.terms[0].subj.set.mask = EcsSelf;
+    desc.expr = "?Prefab, ?Disabled";
+    pyflecs::filter owners(mpRaw, desc);
+    auto owners_it = owners.iter();
+    int64_t owned = 0;
+    while (owners_it.next())
+        owned += owners_it.count();
+    return matched == owned ? id : 0;
+}
+
+bool world::progress(float delta_time)
+{
+    mError.take();
+    auto result = ecs_progress(mpRaw, delta_time);
+    auto error = mError.take();
+    if (error)
+        std::rethrow_exception(error);
+    return result;
+}
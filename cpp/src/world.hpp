@@ -26,6 +26,8 @@
 #include "entity.hpp"
 #include "filter.hpp"
 #include "query.hpp"
+#include "system.hpp"
+#include "observer.hpp"
 
 #include <string>
 #include <vector>
@@ -43,13 +45,12 @@ namespace pyflecs {
 
         pyflecs::entity entity();
         pyflecs::entity entity(std::string name);
-        pyflecs::entity entity(pyflecs::entity& c);
+        pyflecs::entity entity(ecs_id_t c);
         pyflecs::entity lookup(std::string name);
         pyflecs::entity lookup_path(std::string name);
         pyflecs::id lookup_by_id(ecs_id_t eid);
 
-        std::vector<pyflecs::entity> bulk_entity_w_id(ecs_id_t eid,
-            int32_t count);
+        const ecs_entity_t* bulk_entity_w_id(ecs_id_t eid, int32_t count);
         pyflecs::bulk_entity_builder bulk_entity_builder(int32_t count);
 
         pyflecs::entity component(std::string name, size_t size, 
@@ -60,11 +61,114 @@ namespace pyflecs {
         pyflecs::query create_query(std::string name, std::string expr,
             bool instanced, std::vector<ecs_term_t> terms);
 
+        pyflecs::system create_system(std::string name, std::string expr,
+            bool instanced, std::vector<ecs_term_t> terms, ecs_entity_t phase,
+            bool multi_threaded, pyflecs::system_callback callback);
+
+        pyflecs::observer create_observer(std::string name, std::string expr,
+            std::vector<ecs_term_t> terms, std::vector<ecs_entity_t> events,
+            pyflecs::observer_callback callback);
+
         pyflecs::iter create_term_iter(ecs_term_t* term)
         {
             return pyflecs::iter(ecs_term_iter(mpRaw, term));
         }
 
+        bool progress(float delta_time);
+
+        bool defer_begin()
+        {
+            return ecs_defer_begin(mpRaw);
+        }
+
+        bool defer_end()
+        {
+            return ecs_defer_end(mpRaw);
+        }
+
+        bool is_deferred()
+        {
+            return ecs_is_deferred(mpRaw);
+        }
+
+        void set_threads(int32_t threads)
+        {
+            ecs_set_threads(mpRaw, threads);
+        }
+
+        const ecs_world_info_t* info() const
+        {
+            return ecs_get_world_info(mpRaw);
+        }
+
+        /**
+         * Copies component c of each entity to dst, one row of size bytes
+         * per id. Rows of entities which are not alive or do not have the
+         * component are zeroed and have found set to false. Returns how many
+         * entities had the component.
+         */
+        size_t get_many(ecs_id_t c, size_t size, const ecs_entity_t* ids,
+            size_t count, uint8_t* dst, bool* found);
+
+        /**
+         * Sets component c of each entity from data, one row of size bytes
+         * per id. Ids are visited grouped by the table holding them, so the
+         * entities of one table all take the same table edge.
+         */
+        void set_many(ecs_id_t c, size_t size, const ecs_entity_t* ids,
+            size_t count, const uint8_t* data);
+
+        /**
+         * Adds or removes id c on each entity, grouped by table.
+         */
+        void add_many(ecs_id_t c, const ecs_entity_t* ids, size_t count);
+        void remove_many(ecs_id_t c, const ecs_entity_t* ids, size_t count);
+
+        /**
+         * Deletes each entity, grouped by table. Entities already deleted by
+         * an earlier delete in the batch, such as cascaded children, are
+         * skipped.
+         */
+        void delete_many(const ecs_entity_t* ids, size_t count);
+
+        /**
+         * Returns the entities that deleting the ids would delete along with
+         * them, which are their children and, recursively, their children's
+         * children.
+         */
+        std::vector<ecs_entity_t> descendants(const ecs_entity_t* ids,
+            size_t count);
+
+        /**
+         * Drains the iterator and returns the id of its only term if it
+         * matched exactly the entities owning that id, including prefab and
+         * disabled ones, so table-level operations on the id affect the same
+         * entities. Returns 0 otherwise.
+         */
+        ecs_id_t owners_id(pyflecs::iter& it);
+
+        /**
+         * Removes the id from every entity owning it, a table at a time.
+         */
+        void remove_all(ecs_id_t id)
+        {
+            ecs_remove_all(mpRaw, id);
+        }
+
+        /**
+         * Deletes every entity owning the id, a table at a time.
+         */
+        void delete_with(ecs_id_t id)
+        {
+            ecs_delete_with(mpRaw, id);
+        }
+
+        /**
+         * Deletes every table that currently holds no entities and returns
+         * how many were deleted.
+         */
+        int32_t delete_empty_tables();
+
         ecs_world_t* raw()
         {
             return mpRaw;
@@ -73,5 +177,9 @@ namespace pyflecs {
     private:
         ecs_world_t *mpRaw;
 
+        // Stores the first exception raised by a system callback during
+        // progress, which is rethrown once control returns from flecs.
+        pyflecs::system_error mError;
+
     };
 }
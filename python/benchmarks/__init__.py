@@ -0,0 +1,8 @@
+"""
+Benchmarks of the binding, run with `python -m benchmarks` from the python
+directory. Results can be written as JSON and compared against a baseline to
+catch regressions between releases.
+"""
+from ._harness import BENCHMARKS, Result, benchmark, compare, run_all
+
+__all__ = ['BENCHMARKS', 'Result', 'benchmark', 'compare', 'run_all']
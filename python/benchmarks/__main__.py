@@ -0,0 +1,55 @@
+"""
+Runs the benchmarks and optionally compares them against a baseline.
+
+Example:
+    python -m benchmarks --entities 1000 100000 --archetypes 1 64 \\
+        --output results.json --baseline baseline.json
+"""
+import argparse
+import fnmatch
+import os
+import sys
+
+from . import cases  # noqa: F401, registers the benchmarks
+from ._harness import BENCHMARKS, compare, load, run_all, save, to_json
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+"""The committed baseline, compared against when --baseline is not given."""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('patterns', nargs='*', default=['*'],
+                        help="Glob patterns of the benchmarks to run")
+    parser.add_argument('--entities', type=int, nargs='+',
+                        default=[1000, 100000])
+    parser.add_argument('--archetypes', type=int, nargs='+', default=[1, 64])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Writes the results as JSON")
+    parser.add_argument('--baseline',
+                        help="Compares against results written by --output, "
+                             "by default the committed baseline.json if any")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="The slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS
+             if any(fnmatch.fnmatch(name, val) for val in args.patterns)]
+    results = to_json(run_all(names, args.entities, args.archetypes,
+                              args.repeat, args.seed, log=print))
+    if args.output:
+        save(results, args.output)
+
+    if args.baseline is None and os.path.exists(BASELINE):
+        args.baseline = BASELINE
+    if args.baseline:
+        regressions = compare(results, load(args.baseline), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Registers, runs and compares benchmarks. Every benchmark is run for each
+combination of entity count and archetype count, in a fresh world built from
+a fixed seed, so runs on the same machine are comparable.
+"""
+import json
+import platform
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+Setup = Callable[[int, int, np.random.Generator], Callable[[], Any]]
+"""Builds the state for one run and returns the function to time. Takes the
+entity count, the archetype count and a seeded random generator."""
+
+Result = namedtuple("Result", ['name', 'entities', 'archetypes', 'times'])
+"""The times, in seconds, of every repeat of one benchmark configuration."""
+
+BENCHMARKS: Dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """
+    Registers a benchmark under the given name.
+    """
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def run(setup: Setup, entities: int, archetypes: int, repeat: int,
+        seed: int) -> List[float]:
+    """
+    Times the benchmark repeat times. Setup runs before every repeat and is
+    not timed, so benchmarks that modify the world start from the same state.
+    """
+    times = []
+    for _ in range(repeat):
+        fn = setup(entities, archetypes, np.random.default_rng(seed))
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_all(names: Iterable[str], entities: Iterable[int],
+            archetypes: Iterable[int], repeat: int, seed: int,
+            log: Optional[Callable[[str], None]] = None) -> List[Result]:
+    results = []
+    for name in names:
+        for count in entities:
+            for num_archetypes in archetypes:
+                times = run(BENCHMARKS[name], count, num_archetypes, repeat,
+                            seed)
+                result = Result(name, count, num_archetypes, times)
+                results.append(result)
+                if log is not None:
+                    log(format_result(result))
+    return results
+
+
+def _key(entry: Dict[str, Any]) -> Tuple[str, int, int]:
+    return entry['name'], entry['entities'], entry['archetypes']
+
+
+def to_json(results: List[Result]) -> Dict[str, Any]:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': [
+            {'name': result.name, 'entities': result.entities,
+             'archetypes': result.archetypes, 'times': result.times,
+             'min': min(result.times),
+             'median': float(np.median(result.times))}
+            for result in results],
+    }
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(data: Dict[str, Any], path: str):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def format_result(result: Result) -> str:
+    return (f"{result.name:<28} entities={result.entities:<8} "
+            f"archetypes={result.archetypes:<4} "
+            f"median={np.median(result.times) * 1e3:10.3f} ms")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float) -> List[str]:
+    """
+    Compares the median time of each configuration found in both runs.
+
+    Returns:
+        One line per configuration slower than threshold times the baseline.
+    """
+    previous = {_key(entry): entry for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        old = previous.get(_key(entry))
+        if old is None or old['median'] == 0:
+            continue
+        ratio = entry['median'] / old['median']
+        if ratio > threshold:
+            name, count, num_archetypes = _key(entry)
+            regressions.append(
+                f"{name} entities={count} archetypes={num_archetypes}: "
+                f"{old['median'] * 1e3:.3f} ms -> "
+                f"{entry['median'] * 1e3:.3f} ms ({ratio:.2f}x)")
+    return regressions
@@ -0,0 +1,245 @@
+"""
+The benchmarks of the binding. Entities are spread evenly across the
+archetypes by adding one of archetypes tags to each, so the archetype count
+controls how many tables are iterated.
+"""
+from typing import List, Tuple
+
+import numpy as np
+import flecs
+from flecs._entity import Entity
+
+from ._harness import benchmark
+
+
+def _world(archetypes: int) -> Tuple[flecs.World, List[Entity]]:
+    world = flecs.World()
+    world.component("Position", 'float32', 3)
+    world.component("Velocity", 'float32', 3)
+    tags = [world.tag(f"Archetype{idx}") for idx in range(archetypes)]
+    return world, tags
+
+
+def _spawn_data(tags: List[Entity], entities: int, rng: np.random.Generator
+                ) -> List[Tuple[Entity, np.ndarray, np.ndarray]]:
+    """
+    Generates random positions and velocities for each archetype's share of
+    the entities.
+    """
+    return [(tag, rng.standard_normal((count, 3), 'float32'),
+             rng.standard_normal((count, 3), 'float32'))
+            for tag, count in zip(tags, _split(entities, len(tags)))]
+
+
+def _spawn(world: flecs.World,
+           data: List[Tuple[Entity, np.ndarray, np.ndarray]]) -> np.ndarray:
+    """
+    Creates the entities, one bulk creation per archetype, and returns their
+    ids.
+    """
+    position = world.lookup("Position")
+    velocity = world.lookup("Velocity")
+    results = []
+    for tag, pos, vel in data:
+        builder = world.bulk_entity_builder(len(pos))
+        builder.add(position, pos)
+        builder.add(velocity, vel)
+        builder.add(tag)
+        results.append(builder.build(as_array=True))
+    return np.concatenate(results)
+
+
+def _populate(world: flecs.World, tags: List[Entity], entities: int,
+              rng: np.random.Generator) -> np.ndarray:
+    """
+    Creates the entities with random positions and velocities and returns
+    their ids.
+    """
+    return _spawn(world, _spawn_data(tags, entities, rng))
+
+
+def _split(entities: int, archetypes: int) -> List[int]:
+    counts = [entities // archetypes] * archetypes
+    for idx in range(entities % archetypes):
+        counts[idx] += 1
+    return counts
+
+
+@benchmark("create_single")
+def create_single(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    position = world.lookup("Position")
+    values = rng.standard_normal((entities, 3), 'float32')
+
+    def run():
+        for idx in range(entities):
+            e = world.entity()
+            e.set(position, values[idx])
+            e.add(tags[idx % archetypes])
+    return run
+
+
+@benchmark("create_bulk_w_id")
+def create_bulk_w_id(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    counts = _split(entities, archetypes)
+
+    def run():
+        for tag, count in zip(tags, counts):
+            world.bulk_entity_w_id(tag, count, as_array=True)
+    return run
+
+
+@benchmark("create_bulk_builder")
+def create_bulk_builder(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    data = _spawn_data(tags, entities, rng)
+    return lambda: _spawn(world, data)
+
+
+@benchmark("entity_set")
+def entity_set(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    position = world.lookup("Position")
+    items = world.entities_from_ids(_populate(world, tags, entities, rng))
+    values = rng.standard_normal((entities, 3), 'float32')
+
+    def run():
+        for e, value in zip(items, values):
+            e.set(position, value)
+    return run
+
+
+@benchmark("set_many")
+def set_many(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    ids = _populate(world, tags, entities, rng)
+    values = rng.standard_normal((entities, 3), 'float32')
+    return lambda: world.set_many("Position", ids, values)
+
+
+@benchmark("entity_get")
+def entity_get(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    position = world.lookup("Position")
+    items = world.entities_from_ids(_populate(world, tags, entities, rng))
+
+    def run():
+        for e in items:
+            e.get(position)
+    return run
+
+
+def _integrate(it):
+    it["Position"][:] += it["Velocity"]
+
+
+@benchmark("filter_iter")
+def filter_iter(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    _populate(world, tags, entities, rng)
+    f = world.filter_builder(world.lookup("Position"),
+                             world.lookup("Velocity")).build()
+
+    def run():
+        for it in f:
+            _integrate(it)
+    return run
+
+
+@benchmark("query_iter")
+def query_iter(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    _populate(world, tags, entities, rng)
+    q = world.query_builder(world.lookup("Position"),
+                            world.lookup("Velocity")).build()
+
+    def run():
+        for it in q:
+            _integrate(it)
+    return run
+
+
+@benchmark("world_each")
+def world_each(entities, archetypes, rng):
+    world, tags = _world(archetypes)
+    _populate(world, tags, entities, rng)
+
+    def run():
+        for it in world.each("Position"):
+            it["Position"][:] *= 0.5
+    return run
+
+
+@benchmark("prefab_is_a")
+def prefab_is_a(entities, archetypes, rng):
+    """
+    Iterates the velocity inherited from one prefab per archetype alongside
+    each instance's own position.
+    """
+    world, tags = _world(archetypes)
+    position = world.lookup("Position")
+    velocity = world.lookup("Velocity")
+    prefabs = []
+    for tag in tags:
+        prefab = world.prefab()
+        prefab.set(velocity, rng.standard_normal(3, 'float32'))
+        prefab.add(tag)
+        prefabs.append(prefab)
+    values = rng.standard_normal((entities, 3), 'float32')
+    for idx in range(entities):
+        e = world.entity()
+        e.is_a(prefabs[idx % archetypes])
+        e.set(position, values[idx:idx + 1])
+    q = world.query_builder(position, velocity).build()
+
+    def run():
+        for it in q:
+            _integrate(it)
+    return run
+
+
+@benchmark("snapshot_rollback")
+def snapshot_rollback(entities, archetypes, rng):
+    """
+    Moves every entity, then rolls the world back to one kept snapshot, as a
+    simulation rewinding each frame would.
+    """
+    world, tags = _world(archetypes)
+    _populate(world, tags, entities, rng)
+    snapshot = world.snapshot()
+
+    def run():
+        for it in world.each("Position"):
+            it["Position"][:] += 1
+        world.restore(snapshot, keep=True)
+    return run
+
+
+@benchmark("hierarchy_cascade")
+def hierarchy_cascade(entities, archetypes, rng):
+    """
+    Iterates a cascade query over one parent per archetype, each owning an
+    equal share of the entities as children, adding each parent's position to
+    its children's.
+    """
+    world, tags = _world(archetypes)
+    position = world.lookup("Position")
+    ids = _populate(world, tags, entities, rng)
+    parents = []
+    for tag in tags:
+        parent = world.entity()
+        parent.set(position, rng.standard_normal((1, 3), 'float32'))
+        parent.add(tag)
+        parents.append(parent)
+    for idx, e in enumerate(world.entities_from_ids(ids)):
+        parents[idx % archetypes].add_child(e)
+    q = world.query_builder(expr='Position, ?Position(parent|cascade)',
+                            instanced=True).build()
+
+    def run():
+        for it in q:
+            parent = it[1]
+            if len(parent):
+                it[0][:] += parent
+    return run
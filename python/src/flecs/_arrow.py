@@ -0,0 +1,140 @@
+"""
+Converts between component columns and Apache Arrow record batches. pyarrow
+is an optional dependency, so it is only imported when a conversion is used.
+
+A component maps to one Arrow column: scalar components to a primitive
+column, components with a shape to a fixed size list of the flattened values
+and structured dtypes to a struct column with one child per field.
+"""
+from typing import (TYPE_CHECKING, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from ._component import Component
+    from ._filter import IterPlan
+
+ENTITY_COLUMN = 'entity'
+"""The name of the column holding the entity ids."""
+
+
+def import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("pyarrow is required to convert to and from "
+                          "record batches") from e
+    return pyarrow
+
+
+def _to_arrow(pa, values: np.ndarray) -> 'pa.Array':
+    """
+    Wraps an array of shape (N, ...) as an Arrow array of N values. Contiguous
+    primitive columns are wrapped without copying.
+    """
+    count = len(values)
+    if values.ndim > 1:
+        size = int(np.prod(values.shape[1:]))
+        flat = _to_arrow(pa, values.reshape(count * size))
+        return pa.FixedSizeListArray.from_arrays(flat, size)
+    if values.dtype.names is not None:
+        children = [_to_arrow(pa, values[name]) for name in values.dtype.names]
+        return pa.StructArray.from_arrays(children,
+                                          names=list(values.dtype.names))
+    return pa.array(np.ascontiguousarray(values))
+
+
+def _from_arrow(array: 'pa.Array', dtype: np.dtype,
+                shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Converts an Arrow array of N values to an array of shape (N, *shape).
+    """
+    count = len(array)
+    if array.null_count:
+        raise ValueError("Record batch columns may not contain nulls")
+    if int(np.prod(shape)) > 1:
+        flat = _from_arrow(array.flatten(), dtype, ())
+        return flat.reshape(count, *shape)
+
+    if dtype.names is not None:
+        result = np.empty(count, dtype)
+        children = dict(zip([field.name for field in array.type],
+                            array.flatten()))
+        for name in dtype.names:
+            field = dtype.fields[name][0]
+            base, field_shape = field.subdtype or (field, ())
+            result[name] = _from_arrow(children[name], base, field_shape)
+    else:
+        result = array.to_numpy(zero_copy_only=False).astype(dtype,
+                                                             copy=False)
+    return result.reshape(count, *shape)
+
+
+def _column_values(view: Optional[np.ndarray], component: 'Component',
+                   count: int, copy: bool) -> Optional[np.ndarray]:
+    if view is None or len(view) == 0:
+        return None
+    if count > 1 and view.strides[0] == 0:
+        # Shared from a base entity, so materialize the repeated value
+        copy = True
+    if int(np.prod(component.shape)) == 1:
+        view = view.reshape(count)
+    return np.array(view) if copy else view
+
+
+def to_record_batches(pa, it, plan: 'IterPlan',
+                      copy: bool) -> Iterator['pa.RecordBatch']:
+    """
+    Yields one record batch per table visited by the raw iterator.
+    """
+    components = [entry.component for entry in plan.components]
+    while it.next():
+        count = it.count()
+        ids = it.entities()
+        names = [ENTITY_COLUMN]
+        arrays = [pa.array(np.array(ids) if copy else ids)]
+        for component, view in zip(components, it.columns(plan.ptr)):
+            if not component.is_component:
+                continue
+            values = _column_values(view, component, count, copy)
+            names.append(component.name)
+            if values is None:
+                # An optional term missing from this table
+                arrays.append(pa.nulls(count, _arrow_type(pa, component)))
+            else:
+                arrays.append(_to_arrow(pa, values))
+        yield pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _arrow_type(pa, component: 'Component') -> 'pa.DataType':
+    example = np.zeros((1, *component.shape), component.dtype)
+    if int(np.prod(component.shape)) == 1:
+        example = example.reshape(1)
+    return _to_arrow(pa, example).type
+
+
+def record_batch_columns(batch: 'pa.RecordBatch',
+                         components: List['Component']
+                         ) -> List[np.ndarray]:
+    """
+    Converts the column of each component to a contiguous component array.
+    """
+    results = []
+    for component in components:
+        column = batch.column(batch.schema.get_field_index(component.name))
+        values = _from_arrow(column, component.dtype, component.shape)
+        results.append(np.ascontiguousarray(values))
+    return results
+
+
+def iter_record_batches(pa, batches: Union['pa.RecordBatch', 'pa.Table',
+                                           Iterable['pa.RecordBatch']]
+                        ) -> Iterator['pa.RecordBatch']:
+    if isinstance(batches, pa.RecordBatch):
+        yield batches
+    elif isinstance(batches, pa.Table):
+        yield from batches.to_batches()
+    else:
+        yield from batches
@@ -0,0 +1,206 @@
+"""
+Saves and loads worlds using a columnar file format, so a world can be rebuilt
+with one bulk creation per table instead of one call per entity.
+
+A file starts with a fixed header holding the offset of a JSON footer. The
+footer lists the components and tags by name, and for every table the ids it
+holds, the offset of its entity ids and the offset of each component column.
+Each block of data is stored contiguously, aligned to ALIGNMENT bytes, so it
+can be passed straight from a memory map to flecs.
+"""
+import json
+import mmap
+import os
+import struct
+from typing import TYPE_CHECKING, BinaryIO, Dict, List, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ._world import World
+
+
+MAGIC = b'PYFLECS\0'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQ')
+ALIGNMENT = 64
+
+PathLike = Union[str, os.PathLike]
+
+
+def _write_block(f: BinaryIO, data: np.ndarray) -> int:
+    """
+    Writes the data at the next aligned offset and returns that offset.
+    """
+    offset = -f.tell() % ALIGNMENT
+    f.write(b'\0' * offset)
+    offset = f.tell()
+    f.write(memoryview(np.ascontiguousarray(data)).cast('B'))
+    return offset
+
+
+class _Writer:
+    """
+    Writes the tables of a world in the order they are visited.
+    """
+    def __init__(self, world: 'World', f: BinaryIO):
+        self._world = world
+        self._f = f
+        self.tables = []
+
+        # Ids whose data can be written, mapped to their component
+        self._components = {int(c): c for c in world._components.values()}
+
+    def _encode_id(self, eid: int) -> Union[int, List[int]]:
+        """
+        Returns the id as stored in the footer. Pairs are stored as their
+        relation and object, so they can be rebuilt from remapped ids.
+        """
+        ptr = self._world.ptr.lookup_by_id(eid)
+        if ptr.is_pair():
+            return [ptr.relation().raw(), ptr.object().raw()]
+        return eid
+
+    def _data_component(self, eid: int):
+        component = self._components.get(eid)
+        if component is None:
+            ptr = self._world.ptr.lookup_by_id(eid)
+            if ptr.is_pair():
+                # flecs stores the relation's type, or the object's when the
+                # relation is a tag
+                component = self._components.get(ptr.relation().raw())
+                if component is None:
+                    component = self._components.get(ptr.object().raw())
+        return component
+
+    def write_table(self, it):
+        ids = [int(eid) for eid in it.table_type()]
+        count = it.count()
+        tags = []
+        columns = []
+        for eid in ids:
+            column = it.table_column(eid)
+            if len(column) == 0:
+                tags.append(self._encode_id(eid))
+            elif self._data_component(eid) is not None:
+                offset = _write_block(self._f, column)
+                columns.append({'id': self._encode_id(eid),
+                                'offset': offset, 'nbytes': len(column)})
+            # Data of components not created through the world, such as
+            # entity names, cannot be described and is not saved.
+
+        entities = _write_block(self._f, it.entities())
+        self.tables.append({'count': count, 'entities': entities,
+                            'tags': tags, 'columns': columns})
+
+
+def save_world(world: 'World', path: PathLike):
+    """
+    Writes every table holding a component or tag created through the world.
+    """
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+        # Prefabs are written first, so loading creates them before the
+        # instances referring to them
+        writer = _Writer(world, f)
+        prefab = int(world.prefab_entity)
+        for write_prefabs in (True, False):
+            for it in world._iter_tables():
+                if (prefab in it.table_type()) == write_prefabs:
+                    writer.write_table(it)
+
+        footer = {
+            'components': [
+                {'id': int(c), 'name': name,
+                 'dtype': np.lib.format.dtype_to_descr(c.dtype),
+                 'shape': list(c.shape)}
+                for name, c in world._components.items()],
+            'tags': [{'id': int(t), 'name': name}
+                     for name, t in world._tags.items()],
+            'tables': writer.tables,
+        }
+        offset = f.tell()
+        f.write(json.dumps(footer).encode('utf-8'))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, offset))
+
+
+def _load_table(world: 'World', mm: mmap.mmap, table: dict,
+                id_map: Dict[int, int]):
+    def decode_id(eid: Union[int, List[int]]) -> int:
+        if isinstance(eid, list):
+            relation, obj = (id_map.get(val, val) for val in eid)
+            return world.ptr.pair(relation, obj)
+        return id_map.get(eid, eid)
+
+    count = table['count']
+    builder = world.bulk_entity_builder(count)
+    builder.set_entities(np.frombuffer(mm, dtype=np.uint64, count=count,
+                                       offset=table['entities']))
+    for eid in table['tags']:
+        builder.add(decode_id(eid))
+    for column in table['columns']:
+        data = np.frombuffer(mm, dtype=np.uint8, count=column['nbytes'],
+                             offset=column['offset'])
+        builder.add(decode_id(column['id']), data)
+    builder.build(as_array=True)
+
+
+def _saved_entities(mm: mmap.mmap, footer: dict) -> np.ndarray:
+    """
+    Returns a copy of the ids of every saved entity. No views into the map
+    outlive the call, so it can still be closed.
+    """
+    result = [np.empty(0, dtype=np.uint64)]
+    for table in footer['tables']:
+        result.append(np.frombuffer(mm, dtype=np.uint64, count=table['count'],
+                                    offset=table['entities']))
+    return np.concatenate(result)
+
+
+def _check_free(world: 'World', ids: np.ndarray):
+    in_use = world.ptr.entities_exist(ids)
+    if in_use.any():
+        raise RuntimeError(f"Entity id {ids[in_use.argmax()]} of the saved "
+                           f"world is already in use")
+
+
+def load_world(world: 'World', path: PathLike):
+    """
+    Recreates the components, tags and entities saved by save_world.
+    """
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, version, _, offset = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise RuntimeError(f"{path} is not a flecs world file")
+        if version != VERSION:
+            raise RuntimeError(f"Unsupported world file version {version}")
+        footer = json.loads(mm[offset:].decode('utf-8'))
+
+        # Check the saved entities are free before creating anything, so a
+        # collision does not leave a partial load behind
+        saved = _saved_entities(mm, footer)
+        _check_free(world, saved)
+
+        # Components and tags may get different ids in this world
+        id_map = {}
+        for entry in footer['components']:
+            dtype = np.lib.format.descr_to_dtype(entry['dtype'])
+            shape = tuple(entry['shape'])
+            c = world.component(entry['name'], dtype, shape)
+            if c.dtype != dtype or c.shape != shape:
+                raise RuntimeError(f"Component {entry['name']} does not "
+                                   f"match the saved dtype and shape")
+            id_map[entry['id']] = int(c)
+        for entry in footer['tags']:
+            id_map[entry['id']] = int(world.tag(entry['name']))
+
+        # Components and tags new to this world may have taken a saved id
+        _check_free(world, saved)
+
+        for table in footer['tables']:
+            _load_table(world, mm, table, id_map)
+    finally:
+        mm.close()
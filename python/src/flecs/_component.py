@@ -1,19 +1,27 @@
 """
 Provides access to the flecs component.
 """
+from typing import TYPE_CHECKING, Tuple
+
 import numpy as np
 from numpy.typing import DTypeLike
 
 from ._entity import Entity
 from ._types import ShapeLike
 
+if TYPE_CHECKING:
+    from ._world import World
+
 
 class Component(Entity):
     """
     Wraps a flecs component
     """
-    def __init__(self, ptr, dtype: DTypeLike, shape: ShapeLike):
-        super().__init__(ptr)
+    __slots__ = ('_dtype', '_shape', '_nbytes')
+
+    def __init__(self, eid: int, world: 'World', dtype: DTypeLike,
+                 shape: ShapeLike):
+        super().__init__(eid, world)
         self._dtype = dtype
 
         if isinstance(shape, int):
@@ -21,7 +29,7 @@ class Component(Entity):
         self._shape = shape
 
         # Store the total bytes
-        self._nbytes = np.prod(shape) * dtype.itemsize
+        self._nbytes = int(np.prod(shape)) * dtype.itemsize
 
     @property
     def is_component(self) -> bool:
@@ -31,6 +39,10 @@ class Component(Entity):
     def dtype(self) -> np.dtype:
         return self._dtype
 
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(self._shape)
+
     def create_view(self, buffer: np.ndarray) -> np.ndarray:
         """
         This creates a view into the buffer that matches the component dtype.
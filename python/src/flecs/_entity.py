@@ -1,11 +1,18 @@
 """
 Provides access to the flecs entity.
 """
-from typing import TYPE_CHECKING, Optional, List
+from typing import TYPE_CHECKING, Optional, List, Union
 import numpy as np
+import numpy.typing as npt
 
 if TYPE_CHECKING:
     from ._component import Component
+    from ._world import World
+
+
+EntityLike = Union['Id', int, np.integer]
+"""Anything that identifies an entity: a wrapper or a raw 64-bit id, such as
+an element of the id arrays returned by bulk creation."""
 
 
 class Type:
@@ -26,30 +33,71 @@ class Type:
         return self._ptr.length()
 
 
-class Entity:
+class Id:
+    """
+    A compact, hashable handle to a flecs id. Only the 64-bit id and the
+    world are stored, so large numbers of handles stay cheap. Handles compare
+    and hash equal to the raw integer id.
+    """
+    __slots__ = ('_id', '_world')
+
+    def __init__(self, eid: int, world: 'World'):
+        self._id = eid
+        self._world = world
+
+    @property
+    def world(self) -> 'World':
+        return self._world
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._id})"
+
+    def __str__(self) -> str:
+        return str(self._id)
+
+    def __int__(self) -> int:
+        return self._id
+
+    def __hash__(self) -> int:
+        return hash(self._id)
+
+    def __eq__(self, other):
+        if isinstance(other, (Id, int, np.integer)):
+            return self._id == int(other)
+        return NotImplemented
+
+
+class Entity(Id):
     """
     Provides a wrapper around the Flecs entity object.
     """
-    def __init__(self, ptr):
+    __slots__ = ()
+
+    def __init__(self, eid: int, world: 'World'):
         """
         Creates the entity. All entities must be created through the world.
 
         Args:
-            ptr:
+            eid: The raw entity id.
+            world: The world the entity belongs to.
         """
-        self._ptr = ptr
+        super().__init__(eid, world)
 
     def destruct(self):
         # TODO: Should this check that it's not a component?
-        self._ptr.destruct()
+        world = self._world
+        children = world.descendants(np.array([self._id], dtype=np.uint64))
+        world.ptr.entity_destruct(self._id)
+        world.invalidate(self)
+        world.invalidate_many(children)
 
     @property
     def ptr(self):
-        return self._ptr
+        return self._world.ptr.lookup_by_id(self._id).as_entity()
 
     @property
     def is_alive(self) -> bool:
-        return self._ptr.is_alive()
+        return self._world.ptr.entity_is_alive(self._id)
 
     @property
     def is_component(self) -> bool:
@@ -57,18 +105,18 @@ class Entity:
 
     @property
     def is_valid(self) -> bool:
-        return self._ptr.is_valid()
+        return self._world.ptr.entity_is_valid(self._id)
 
     @property
     def type(self) -> Type:
-        return Type(self._ptr.type())
+        return Type(self._world.ptr.entity_type(self._id))
 
     @property
     def name(self) -> str:
-        return self._ptr.name()
+        return self._world.ptr.entity_name(self._id)
 
-    def add(self, component: 'Entity'):
-        self._ptr.add(component.ptr)
+    def add(self, component: EntityLike):
+        self._world.ptr.entity_add(self._id, int(component))
         return self
 
     def set(self, component: 'Component', value: np.ndarray):
@@ -77,78 +125,74 @@ class Entity:
             raise RuntimeError(f"Attempting to set component {component.name} "
                                f"of dtype {component.dtype} to value with "
                                f"dtype {value.dtype}")
-        self._ptr.set(component.ptr, value.view('uint8'))
+        self._world.ptr.entity_set(self._id, int(component),
+                                   value.view('uint8'))
         return self
 
     def get(self, component: 'Component') -> np.ndarray:
-        return component.create_view(self._ptr.get(component.ptr))[0]
+        data = self._world.ptr.entity_get(self._id, int(component))
+        return component.create_view(data)[0]
 
-    def remove(self, component: 'Entity'):
-        self._ptr.remove(component.ptr)
+    def remove(self, component: EntityLike):
+        self._world.ptr.entity_remove(self._id, int(component))
         return self
 
-    def has(self, component: 'Entity') -> bool:
-        return self._ptr.has(component.ptr)
+    def has(self, component: EntityLike) -> bool:
+        return self._world.ptr.entity_has(self._id, int(component))
 
-    def add_pair(self, component: 'Entity', other: 'Entity'):
-        self._ptr.add_pair(component.ptr, other.ptr)
+    def add_pair(self, component: EntityLike, other: EntityLike):
+        self._world.ptr.entity_add_pair(self._id, int(component), int(other))
         return self
 
-    def remove_pair(self, component: 'Entity', other: 'Entity'):
-        self._ptr.remove_pair(component.ptr, other.ptr)
+    def remove_pair(self, component: EntityLike, other: EntityLike):
+        self._world.ptr.entity_remove_pair(self._id, int(component),
+                                           int(other))
         return self
 
-    def set_pair(self, component: 'Component', other: 'Entity',
+    def set_pair(self, component: 'Component', other: EntityLike,
                  value: np.ndarray):
         if value.dtype != component.dtype:
             raise RuntimeError(f"Attempting to set component {component.name} "
                                f"of dtype {component.dtype} to value with "
                                f"dtype {value.dtype}")
-        self._ptr.set_pair(component.ptr, other.ptr, value.view('uint8'))
+        self._world.ptr.entity_set_pair(self._id, int(component), int(other),
+                                        value.view('uint8'))
         return self
 
-    def has_pair(self, component: 'Entity', other: 'Entity'):
-        return self._ptr.has_pair(component.ptr, other.ptr)
+    def has_pair(self, component: EntityLike, other: EntityLike):
+        return self._world.ptr.entity_has_pair(self._id, int(component),
+                                               int(other))
 
     @property
     def path(self) -> str:
-        return self._ptr.path()
+        return self._world.ptr.entity_path(self._id)
 
-    def add_child(self, e: 'Entity'):
-        return self._ptr.add_child(e.ptr)
+    def add_child(self, e: EntityLike):
+        return self._world.ptr.entity_add_child(self._id, int(e))
 
     def lookup(self, name: str) -> Optional['Entity']:
-        e = self._ptr.lookup(name)
-        return Entity(e) if e.raw() else None
-
-    def is_a(self, e: 'Entity'):
-        self._ptr.is_a(e.ptr)
-
-    def __repr__(self) -> str:
-        return f"Entity({self._ptr.raw()})"
-
-    def __str__(self) -> str:
-        return str(self._ptr.raw())
+        e = self._world.ptr.entity_lookup(self._id, name)
+        return Entity(e, self._world) if e else None
 
-    def __int__(self) -> int:
-        return self._ptr.raw()
-
-    def __eq__(self, other):
-        return int(self) == int(other)
+    def is_a(self, e: EntityLike):
+        self._world.ptr.entity_is_a(self._id, int(e))
 
 
-class Pair:
+class Pair(Id):
     """
     Wraps a pair
     """
-    def __init__(self, ptr, relation: Entity, obj: Entity):
-        self._ptr = ptr
+    __slots__ = ('_relation', '_object')
+
+    def __init__(self, eid: int, world: 'World', relation: Entity,
+                 obj: Entity):
+        super().__init__(eid, world)
         self._relation = relation
         self._object = obj
 
     @property
     def ptr(self):
-        return self._ptr
+        return self._world.ptr.lookup_by_id(self._id)
 
     @property
     def relation(self) -> Entity:
@@ -163,16 +207,70 @@ class BulkEntityBuilder:
     """
     Provides a mechanism for creating entities in bulk.
     """
-    def __init__(self, ptr):
+    def __init__(self, ptr, world: 'World'):
         self._ptr = ptr
+        self._world = world
+
+        # flecs reads the data on build, so it is held until then
+        self._data = []
 
     @property
     def count(self) -> int:
         return self._ptr.count()
 
-    def add(self, e: Entity, data: np.ndarray):
-        self._ptr.add(e.ptr, data)
+    def add(self, e: EntityLike, data: Optional[np.ndarray] = None):
+        """
+        Adds an id to every entity created.
 
-    def build(self) -> List[Entity]:
-        results = self._ptr.build()
-        return [Entity(val) for val in results]
+        Args:
+            e: The component, tag or pair to add.
+            data: One value per entity, or None for tags. Values of a
+                component must have its dtype and shape (count, *shape), or
+                be its raw bytes as uint8.
+        """
+        if data is None:
+            self._ptr.add(int(e))
+            return
+
+        if getattr(e, 'is_component', False):
+            nbytes = self.count * e.dtype.itemsize * int(np.prod(e.shape))
+            if data.dtype != np.uint8 and (
+                    data.dtype != e.dtype or
+                    data.shape != (self.count, *e.shape)):
+                raise RuntimeError(f"Attempting to bulk add component "
+                                   f"{e.name} of dtype {e.dtype} and shape "
+                                   f"{e.shape} from data with dtype "
+                                   f"{data.dtype} and shape {data.shape}")
+            if data.nbytes != nbytes:
+                raise RuntimeError(f"Attempting to bulk add component "
+                                   f"{e.name} from {data.nbytes} bytes "
+                                   f"instead of {nbytes}")
+
+        data = np.ascontiguousarray(data)
+        self._data.append(data)
+        self._ptr.add(int(e), data)
+
+    def set_entities(self, ids: npt.ArrayLike):
+        """
+        Creates the entities with the given ids instead of new ones. None of
+        the ids may be in use.
+
+        Args:
+            ids: One id per entity.
+        """
+        self._ptr.set_entities(ids)
+
+    def build(self, as_array: bool = False) -> Union[List[Entity], np.ndarray]:
+        """
+        Creates the entities.
+
+        Args:
+            as_array: If true, returns the ids as a uint64 array instead of
+                wrapping each one in an Entity.
+
+        Returns:
+            The created entities.
+        """
+        ids = self._ptr.build()
+        self._data.clear()
+        return ids if as_array else self._world.entities_from_ids(ids)
@@ -1,15 +1,23 @@
 """
 Wraps various aspects of the flecs filters.
 """
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterator, List,
+                    Optional, Tuple, Union)
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import numpy as np
 
 import flecs._flecs as _flecs
 
 from ._component import Component
-from ._entity import Entity, Pair
+from ._entity import Entity, EntityLike, Pair
+from ._arrow import import_pyarrow, to_record_batches
+from ._stats import IterStats
 
 if TYPE_CHECKING:
+    import pyarrow as pa
     from ._world import World
 
 
@@ -17,28 +25,56 @@ ComponentEntry = namedtuple("ComponentEntry", ['component', 'index'])
 """Defines an object for storing component information."""
 
 
+def resolve_components(ptr, world: 'World') -> List[ComponentEntry]:
+    """
+    Looks up the component for each term of a filter, query or system.
+
+    Args:
+        ptr: The raw object exposing term_count and terms.
+        world: The world the terms belong to.
+
+    Returns:
+        The component entries, skipping any term without component data.
+    """
+    components = []
+    for idx in range(ptr.term_count()):
+        term = ptr.terms(idx)
+        component = world.lookup_by_id(term.id)
+        if isinstance(component, Pair):
+            if component.relation.is_component:
+                component = component.relation
+            elif component.object.is_component:
+                component = component.object
+            else:
+                continue
+
+        components.append(ComponentEntry(
+            component=component, index=idx + 1))
+    return components
+
+
 class Term:
     """
     Wraps the Flecs term object.
     """
-    def __init__(self, id: Optional[Entity] = None):
+    def __init__(self, id: Optional[EntityLike] = None):
         self._ptr = _flecs.ecs_term_t()
         self._id = id
         if id is not None:
-            self._ptr.id = id.ptr.raw()
+            self._ptr.id = int(id)
 
     @property
     def ptr(self):
         return self._ptr
 
     @property
-    def id(self) -> Entity:
+    def id(self) -> EntityLike:
         return self._id
 
     @id.setter
-    def id(self, val: Entity):
+    def id(self, val: EntityLike):
         self._id = val
-        self._ptr.id = val.ptr.raw()
+        self._ptr.id = int(val)
 
 
 class EntitiesIter:
@@ -79,21 +115,64 @@ class EntitiesIter:
         return self
 
 
+class IterPlan:
+    """
+    A precompiled description of the views to build for each table. This is
+    computed once per filter so that iterating does not resolve the size,
+    dtype and shape of every component for every table.
+    """
+    def __init__(self, components: List[ComponentEntry]):
+        self._components = components
+        self._names = {val.component.name: pos
+                       for pos, val in enumerate(components)}
+
+        dtypes = []
+        shapes = []
+        for val in components:
+            if val.component.is_component:
+                dtypes.append(val.component.dtype)
+                shapes.append(list(val.component.shape))
+            else:
+                dtypes.append(None)
+                shapes.append([])
+        self._ptr = _flecs.column_plan([val.index for val in components],
+                                       dtypes, shapes)
+
+        # Component names are not always valid identifiers
+        self._columns = namedtuple(
+            "Columns", [val.component.name for val in components],
+            rename=True)
+
+    @property
+    def ptr(self):
+        return self._ptr
+
+    @property
+    def components(self) -> List[ComponentEntry]:
+        return self._components
+
+    @property
+    def names(self) -> Dict[str, int]:
+        """
+        Maps each component name to its position in the plan.
+        """
+        return self._names
+
+    def make_columns(self, views: tuple) -> tuple:
+        return self._columns._make(views)
+
+
 class FilterIter:
     """
     Provides a wrapper around iteration of a filter.
     """
-    def __init__(self, ptr, world: 'World',
-                 components: List[ComponentEntry]):
+    def __init__(self, ptr, world: 'World', plan: IterPlan):
         self._ptr = ptr
         self._world = world
-
-        # Create a dictionary of the components as well
-        self._components = components
-        self._component_dict = {val.component.name: val for val in components}
+        self._plan = plan
 
     def __contains__(self, item):
-        return item in self._component_dict
+        return item in self._plan.names
 
     def __len__(self) -> int:
         return self._ptr.count()
@@ -107,18 +186,84 @@ class FilterIter:
     def __iter__(self):
         return self
 
+    def __enter__(self) -> 'FilterIter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Releases the iterator early, when it is not iterated to completion.
+        This also happens when the iterator is garbage collected.
+        """
+        self._ptr.close()
+
     def __getitem__(self, item):
-        if isinstance(item, int):
-            info = self._components[item]
-        else:
-            info = self._component_dict[item]
-        data = self._ptr.data(info.component.ptr, info.index)
-        return info.component.create_view(data)
+        """
+        Returns the view of a component for the current table, by name or
+        position. Every view has one row per entity. A component shared from
+        a base entity is a read-only view repeating the base's value.
+        """
+        if not isinstance(item, int):
+            item = self._plan.names[item]
+        return self._ptr.column(self._plan.ptr, item)
+
+    def is_owned(self, item: Union[int, str]) -> bool:
+        """
+        Returns whether the entities of the current table own the component,
+        rather than share it from a base entity.
+
+        Args:
+            item: The name or position of the component.
+        """
+        if not isinstance(item, int):
+            item = self._plan.names[item]
+        return self._ptr.term_owned(self._plan.components[item].index)
+
+    def columns(self) -> tuple:
+        """
+        Returns the views of every component for the current table as a
+        namedtuple, built in a single call. Tags are returned as None.
+        """
+        return self._plan.make_columns(self._ptr.columns(self._plan.ptr))
 
     @property
     def term_count(self) -> int:
         return self._ptr.term_count()
 
+    @property
+    def changed(self) -> bool:
+        """
+        Whether the current table was written to since the query last
+        iterated it. Only available when iterating a Query.
+        """
+        return self._ptr.changed()
+
+    def skip(self):
+        """
+        Skips the current table so that it is not marked as changed by the
+        query's [out] and [inout] terms. Only available when iterating a
+        Query.
+        """
+        self._ptr.skip()
+
+    @property
+    def event(self) -> Entity:
+        """
+        The event that triggered the callback. Only set when iterating from
+        an observer.
+        """
+        return self._world.lookup_by_id(self._ptr.event())
+
+    @property
+    def delta_time(self) -> float:
+        """
+        The time elapsed since the last frame. Only set when iterating from a
+        system.
+        """
+        return self._ptr.delta_time()
+
     @property
     def entities(self) -> EntitiesIter:
         """
@@ -131,33 +276,321 @@ class FilterIter:
         """
         return EntitiesIter(self._ptr, self._world)
 
+    @property
+    def entity_ids(self) -> np.ndarray:
+        """
+        Returns the ids of the entities in the current table as a read-only
+        uint64 view, without wrapping each one. The view is only valid until
+        the iterator advances.
+        """
+        return self._ptr.entities()
+
+
+class TimedFilterIter(FilterIter):
+    """
+    A FilterIter that records its work into an IterStats.
+    """
+    def __init__(self, ptr, world: 'World', plan: IterPlan, stats: IterStats):
+        super().__init__(ptr, world, plan)
+        self._stats = stats
+        self._body_start = None
+
+    def __next__(self):
+        stats = self._stats
+        start = perf_counter()
+        if self._body_start is not None:
+            stats.body_time += start - self._body_start
+        has_next = self._ptr.next()
+        end = perf_counter()
+        stats.iter_time += end - start
+
+        if not has_next:
+            self._body_start = None
+            stats.iterations += 1
+            raise StopIteration
+        stats.tables += 1
+        stats.entities += self._ptr.count()
+        self._body_start = end
+        return self
+
+    def __getitem__(self, item):
+        self._stats.views += 1
+        return super().__getitem__(item)
+
+    def columns(self) -> tuple:
+        self._stats.views += len(self._plan.components)
+        return super().columns()
+
 
 class Filter:
     """
     Provides access to a filter that was created.
     """
-    def __init__(self, ptr, world: 'World'):
+    def __init__(self, ptr, world: 'World', plan: Optional[IterPlan] = None,
+                 shared: bool = False):
+        """
+        Args:
+            ptr: The compiled filter.
+            world: The world the filter was created in.
+            plan: The iteration plan of the filter, computed if not given.
+            shared: Whether the compiled filter is shared with other Filter
+                objects through the world's filter cache.
+        """
         self._ptr = ptr
         self._world = world
+        self._plan = plan or IterPlan(resolve_components(ptr, world))
+        self._components = self._plan.components
+        self._shared = shared
+        self._stats = None
+        world.track_query(self)
+        if world.stats_enabled:
+            self.enable_stats()
 
-        # Lookup components
-        self._components = []
-        for idx in range(ptr.term_count()):
-            term = ptr.terms(idx)
-            component = world.lookup_by_id(term.id)
-            if isinstance(component, Pair):
-                if component.relation.is_component:
-                    component = component.relation
-                elif component.object.is_component:
-                    component = component.object
-                else:
-                    continue
-
-            self._components.append(ComponentEntry(
-                component=component, index=idx + 1))
+    @property
+    def ptr(self):
+        if self._ptr is None:
+            raise RuntimeError("Filter is closed")
+        return self._ptr
+
+    def __enter__(self) -> 'Filter':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Frees the filter. It is also freed when garbage collected, but closing
+        it releases the memory deterministically. Iterators created from the
+        filter must not be used afterwards.
+
+        A filter built through the world's filter cache shares its compiled
+        filter with other builds, so closing it only releases this object.
+        """
+        if self._ptr is None:
+            return
+        if not self._shared:
+            self._ptr.close()
+        self._ptr = None
+
+    @property
+    def closed(self) -> bool:
+        return self._ptr is None or self._ptr.is_closed()
+
+    @property
+    def label(self) -> str:
+        """
+        Describes the filter by the components of its terms.
+        """
+        return ", ".join(val.component.name for val in self._components)
 
     def __iter__(self) -> FilterIter:
-        return FilterIter(self._ptr.iter(), self._world, self._components)
+        if self._stats is None:
+            return FilterIter(self.ptr.iter(), self._world, self._plan)
+        return TimedFilterIter(self.ptr.iter(), self._world, self._plan,
+                               self._stats)
+
+    def enable_stats(self, enabled: bool = True):
+        """
+        Enables recording the tables and entities visited, the views created
+        and the time spent in flecs and in Python while iterating with
+        __iter__. Disabled filters iterate without any instrumentation.
+
+        Args:
+            enabled: False to stop recording and drop the counters.
+        """
+        if enabled:
+            if self._stats is None:
+                self._stats = IterStats()
+            self._world.track_stats(self)
+        else:
+            self._stats = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters recorded since stats were enabled, as described
+        by IterStats.as_dict, or an empty dict if stats are disabled.
+        """
+        return {} if self._stats is None else self._stats.as_dict()
+
+    def iter_columns(self) -> Iterator[tuple]:
+        """
+        Iterates the matched tables, yielding a namedtuple with a view of
+        every component per table. This skips the per-component lookups of
+        FilterIter.__getitem__.
+        """
+        it = self.ptr.iter()
+        plan = self._plan
+        while it.next():
+            yield plan.make_columns(it.columns(plan.ptr))
+
+    def to_record_batches(self, copy: bool = True
+                          ) -> Iterator['pa.RecordBatch']:
+        """
+        Yields one Arrow record batch per matched table, with a column of
+        entity ids named 'entity' followed by one column per component. Tags
+        are left out. Requires pyarrow.
+
+        Args:
+            copy: If false, the columns wrap the table storage without
+                copying, so the batches are only valid until the world is
+                next modified.
+
+        Returns:
+            An iterator over the record batches.
+        """
+        pa = import_pyarrow()
+        return to_record_batches(pa, self.ptr.iter(), self._plan, copy)
+
+    def _component_entry(self, item: Union[int, str, Component]
+                         ) -> ComponentEntry:
+        if isinstance(item, int):
+            return self._components[item]
+        name = item.name if isinstance(item, Component) else item
+        for entry in self._components:
+            if entry.component.name == name:
+                return entry
+        raise KeyError(f"Component {name} is not part of the filter")
+
+    def gather(self, component: Union[int, str, Component],
+               return_ids: bool = False
+               ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Concatenates a component across all matched tables. The output is
+        allocated once and each table's column is copied into it in
+        iteration order.
+
+        Args:
+            component: The component, its name, or its index in the filter.
+            return_ids: If true, also returns the matching entity ids.
+
+        Returns:
+            An array of shape (N, *shape) with the component dtype, and the
+            uint64 entity id array if return_ids is set.
+        """
+        entry = self._component_entry(component)
+        data, ids = self.ptr.iter().gather(entry.index, return_ids)
+        result = entry.component.create_view(data)
+        return (result, ids) if return_ids else result
+
+    def scatter(self, component: Union[int, str, Component],
+                values: np.ndarray, ids: Optional[np.ndarray] = None):
+        """
+        Writes a contiguous array back into the matched tables in iteration
+        order. This is the inverse of gather.
+
+        Args:
+            component: The component, its name, or its index in the filter.
+            values: An array of shape (N, *shape) with the component dtype.
+            ids: The entity ids returned by gather. If given, the write is
+                rejected when the tables no longer hold those entities.
+        """
+        entry = self._component_entry(component)
+        c = entry.component
+        if values.dtype != c.dtype:
+            raise RuntimeError(f"Attempting to scatter component {c.name} "
+                               f"of dtype {c.dtype} from values with "
+                               f"dtype {values.dtype}")
+        if values.shape[1:] != c.shape:
+            raise RuntimeError(f"Attempting to scatter component {c.name} "
+                               f"of shape {c.shape} from values with "
+                               f"shape {values.shape[1:]}")
+        values = np.ascontiguousarray(values)
+        self.ptr.iter().scatter(entry.index, values.view('uint8'), ids)
+
+    def bulk_add(self, e: EntityLike) -> int:
+        """
+        Adds a tag, component or pair to every matched entity. The matches
+        are collected first, so the filter sees the world as it was before
+        the call.
+
+        Args:
+            e: The id to add.
+
+        Returns:
+            The number of matched entities.
+        """
+        ids = self.ptr.iter().collect_entities()
+        self._world.ptr.add_many(int(e), ids)
+        return len(ids)
+
+    def bulk_remove(self, e: EntityLike) -> int:
+        """
+        Removes a tag, component or pair from every matched entity. When the
+        filter is the single id being removed, flecs removes it a table at a
+        time instead of an entity at a time.
+
+        Args:
+            e: The id to remove.
+
+        Returns:
+            The number of matched entities.
+        """
+        ids = self.ptr.iter().collect_entities()
+        if int(e) != 0 and self._owners_id() == int(e):
+            self._world.ptr.remove_all(int(e))
+        else:
+            self._world.ptr.remove_many(int(e), ids)
+        return len(ids)
+
+    def bulk_delete(self) -> int:
+        """
+        Deletes every matched entity. When the filter is a single id, flecs
+        deletes the entities a table at a time instead of one at a time.
+
+        Returns:
+            The number of matched entities.
+        """
+        ids = self.ptr.iter().collect_entities()
+        children = self._world.descendants(ids)
+        owners_id = self._owners_id()
+        if owners_id != 0:
+            self._world.ptr.delete_with(owners_id)
+        else:
+            self._world.ptr.delete_many(ids)
+        self._world.invalidate_many(np.concatenate((ids, children)))
+        return len(ids)
+
+    def _owners_id(self) -> int:
+        # The filter's single id, if it matches exactly the entities owning
+        # it, so table-level operations on it affect the same entities.
+        return self._world.ptr.owners_id(self.ptr.iter())
+
+    def worker_iters(self, count: int) -> List[FilterIter]:
+        """
+        Splits iteration across several workers. Each iterator visits a
+        disjoint subset of the matched tables and can be consumed from its own
+        thread, as the GIL is released while flecs advances it.
+
+        Args:
+            count: The number of workers.
+
+        Returns:
+            One FilterIter per worker.
+        """
+        return [FilterIter(self.ptr.worker_iter(idx, count), self._world,
+                           self._plan) for idx in range(count)]
+
+    def run_parallel(self, callback: Callable[[FilterIter], None],
+                     num_workers: int):
+        """
+        Calls the callback once per matched table using a pool of threads.
+        NumPy releases the GIL inside most ufuncs, so vectorised per-table
+        work can run on several cores at once.
+
+        Args:
+            callback: The function to run for each table.
+            num_workers: The number of threads to use.
+        """
+        def run(it: FilterIter):
+            for val in it:
+                callback(val)
+
+        iters = self.worker_iters(num_workers)
+        with ThreadPoolExecutor(num_workers) as pool:
+            futures = [pool.submit(run, it) for it in iters]
+            for future in futures:
+                future.result()
 
 
 class FilterBuilder:
@@ -176,7 +609,7 @@ class FilterBuilder:
         for arg in args:
             self.term(arg)
 
-    def term(self, val: Union[Term, 'Entity']) -> 'FilterBuilder':
+    def term(self, val: Union[Term, EntityLike]) -> 'FilterBuilder':
         """
         Appends the term to the list of terms to add to the filter.
 
@@ -221,17 +654,32 @@ class FilterBuilder:
         """
         self._name = val
 
-    def build(self) -> Filter:
+    def signature(self) -> tuple:
         """
-        Builds the filter.
+        Identifies the filter by its kind, name, expression, instancing and
+        the id and inout of each term. Builders with the same signature build
+        equivalent filters.
+        """
+        terms = tuple((term.id, int(term.inout)) for term in self._terms)
+        return (type(self).__name__, self._name, self._expr, self._instanced,
+                terms)
 
-        Args:
-            build_query: If true, builds a query instead.
+    def build(self) -> Filter:
+        """
+        Builds the filter. The world caches compiled filters by signature, so
+        building an equivalent filter again reuses the compiled filter and
+        only creates a new Filter object around it.
 
         Returns:
             The filter object.
         """
+        entry = self._world.cached_filter(self.signature(), self._create)
+        if entry is None:
+            return Filter(self._create(), self._world)
+        ptr, plan = entry
+        return Filter(ptr, self._world, plan, shared=True)
+
+    def _create(self):
         # Build the raw filter
-        ptr = self._world.ptr.create_filter(self._name, self._expr,
-                                            self._instanced, self._terms)
-        return Filter(ptr, self._world)
+        return self._world.ptr.create_filter(self._name, self._expr,
+                                             self._instanced, self._terms)
@@ -0,0 +1,87 @@
+"""
+Wraps flecs observers. An observer invokes a callback when components are
+added, set or removed on entities matching its terms.
+"""
+import weakref
+from typing import TYPE_CHECKING, Callable, Iterable, List, Union
+
+from ._entity import Entity, EntityLike
+from ._filter import FilterIter, FilterBuilder, IterPlan, resolve_components
+
+if TYPE_CHECKING:
+    from ._world import World
+
+
+ObserverCallback = Callable[[FilterIter], None]
+"""The callback signature for an observer, invoked once per table batch."""
+
+EventLike = Union[str, EntityLike]
+"""An event entity, or one of the names 'OnAdd', 'OnRemove' or 'OnSet'."""
+
+
+class Observer:
+    """
+    Provides access to an observer that was created.
+    """
+    def __init__(self, world: 'World', callback: ObserverCallback):
+        self._ptr = None
+        # The raw world owns the callback, so only hold a weak reference back
+        # to avoid a cycle the garbage collector cannot see through.
+        self._world = weakref.proxy(world)
+        self._callback = callback
+        self._plan = None
+
+    def _bind(self, ptr):
+        self._ptr = ptr
+        self._plan = IterPlan(resolve_components(ptr, self._world))
+
+    def _run(self, it):
+        self._callback(FilterIter(it, self._world, self._plan))
+
+    @property
+    def ptr(self):
+        return self._ptr
+
+    @property
+    def entity(self) -> Entity:
+        """
+        Returns the entity associated with the observer.
+        """
+        return self._world.lookup_by_id(self._ptr.raw())
+
+
+class ObserverBuilder(FilterBuilder):
+    """
+    Provides a builder for an observer. The same as a filter builder, but also
+    takes the events to observe and the callback.
+    """
+    def __init__(self, world: 'World', events: Iterable[EventLike], *args,
+                 callback: ObserverCallback, **kwargs):
+        super().__init__(world, *args, **kwargs)
+        self._events = self._resolve_events(events)
+        self._callback = callback
+
+    def _resolve_events(self, events: Iterable[EventLike]) -> List[int]:
+        if isinstance(events, str) or not hasattr(events, '__iter__'):
+            events = [events]
+        names = {
+            'OnAdd': self._world.on_add_event,
+            'OnRemove': self._world.on_remove_event,
+            'OnSet': self._world.on_set_event,
+        }
+        results = []
+        for event in events:
+            if isinstance(event, str):
+                if event not in names:
+                    raise ValueError(f"Unknown observer event {event}")
+                event = names[event]
+            results.append(int(event))
+        return results
+
+    def build(self) -> Observer:
+        observer = Observer(self._world, self._callback)
+        ptr = self._world.ptr.create_observer(self._name, self._expr,
+                                              self._terms, self._events,
+                                              observer._run)
+        observer._bind(ptr)
+        return observer
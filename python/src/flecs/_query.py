@@ -1,43 +1,40 @@
 """
 Wraps the query. The query is different from a filter, but includes a filter.
 """
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
 
-from ._entity import Pair
-from ._filter import FilterIter, FilterBuilder, ComponentEntry
+from ._filter import Filter, FilterBuilder, FilterIter
 
 if TYPE_CHECKING:
     from ._world import World
 
 
-class Query:
+class Query(Filter):
     """
-    Provides access to a query that was created.
+    Provides access to a query that was created. Iterates the same way as a
+    Filter, but flecs caches the matched tables and tracks changes to them.
 
-    TODO: This is identical to Filter currently.
+    Iterating a query marks the tables of its [out] and [inout] terms as
+    changed, so terms which are only read should be marked [in].
     """
-    def __init__(self, ptr, world: 'World'):
-        self._ptr = ptr
-        self._world = world
-
-        # Lookup components
-        self._components = []
-        for idx in range(ptr.term_count()):
-            term = ptr.terms(idx)
-            component = world.lookup_by_id(term.id)
-            if isinstance(component, Pair):
-                if component.relation.is_component:
-                    component = component.relation
-                elif component.object.is_component:
-                    component = component.object
-                else:
-                    continue
-
-            self._components.append(ComponentEntry(
-                component=component, index=idx + 1))
-
-    def __iter__(self):
-        return FilterIter(self._ptr.iter(), self._world, self._components)
+    def changed(self) -> bool:
+        """
+        Returns whether any matched table was written to since this query was
+        last iterated, either through Entity.set or through the [out] and
+        [inout] terms of another query.
+        """
+        return self.ptr.changed()
+
+    def iter_changed(self) -> Iterator[FilterIter]:
+        """
+        Iterates only the tables which changed since this query last visited
+        them. Unchanged tables are skipped without being marked as changed.
+        """
+        for it in self:
+            if it.changed:
+                yield it
+            else:
+                it.skip()
 
 
 class QueryBuilder(FilterBuilder):
@@ -46,6 +43,13 @@ class QueryBuilder(FilterBuilder):
     a query in the end instead.
     """
     def build(self) -> Query:
+        """
+        Builds the query. Queries are not cached like filters, as each one
+        tracks which tables changed since it was last iterated.
+
+        Returns:
+            The query object.
+        """
         ptr = self._world.ptr.create_query(self._name, self._expr,
                                            self._instanced, self._terms)
         return Query(ptr, self._world)
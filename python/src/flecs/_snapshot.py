@@ -0,0 +1,61 @@
+"""
+Wraps flecs snapshots, which capture the table storage of a world so that it
+can be restored later.
+"""
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from ._filter import Filter
+    from ._world import World
+
+
+class Snapshot:
+    """
+    Provides access to a snapshot that was taken. A snapshot copies each
+    table's storage as a whole, so taking one costs memcpy time per table
+    rather than Python time per entity.
+    """
+    def __init__(self, ptr, world: 'World', filter: Optional['Filter'] = None):
+        self._ptr = ptr
+        self._world = world
+        self._filter = filter
+
+    @property
+    def ptr(self):
+        return self._ptr
+
+    @property
+    def filter(self) -> Optional['Filter']:
+        """
+        The filter selecting the captured entities, or None for the whole
+        world.
+        """
+        return self._filter
+
+    @property
+    def is_valid(self) -> bool:
+        """
+        Whether the snapshot can still be restored. Restoring moves the
+        snapshot's data back into the world, so a snapshot is used up by a
+        restore unless it is kept.
+        """
+        return self._ptr.is_valid()
+
+    def replace(self, ptr):
+        """
+        Replaces the captured state with a newly taken snapshot.
+
+        Args:
+            ptr: The snapshot handle to hold from now on.
+        """
+        self._ptr = ptr
+
+    def restore(self, keep: bool = False):
+        """
+        Restores the world to the state it was in when the snapshot was taken.
+
+        Args:
+            keep: If true, the snapshot stays valid to be restored again, as
+                described by World.restore.
+        """
+        self._world.restore(self, keep)
@@ -0,0 +1,37 @@
+"""
+Opt-in counters for filters, queries and systems. Instrumentation is only
+installed on objects with stats enabled, so the iteration path of every other
+object is unchanged.
+"""
+from typing import Any, Dict
+
+
+class IterStats:
+    """
+    Accumulates the cost of iterating one filter, query or system.
+    """
+    __slots__ = ('iterations', 'tables', 'entities', 'views', 'iter_time',
+                 'body_time')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.iterations = 0
+        self.tables = 0
+        self.entities = 0
+        self.views = 0
+        self.iter_time = 0.0
+        self.body_time = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """
+        Returns the counters:
+            iterations: The number of complete passes over the matched tables.
+            tables: The number of tables visited.
+            entities: The number of entities visited.
+            views: The number of component views created.
+            iter_time: Seconds spent inside flecs advancing to the next table.
+            body_time: Seconds spent in Python between tables.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,158 @@
+"""
+Wraps flecs systems. A system is a query with a callback which flecs runs from
+its pipeline whenever the world progresses.
+"""
+import weakref
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from ._entity import Entity
+from ._filter import (FilterIter, FilterBuilder, IterPlan, TimedFilterIter,
+                      resolve_components)
+from ._stats import IterStats
+
+if TYPE_CHECKING:
+    from ._world import World
+
+
+SystemCallback = Callable[[FilterIter], None]
+"""The callback signature for a system, invoked once per matched table."""
+
+
+class System:
+    """
+    Provides access to a system that was created.
+    """
+    def __init__(self, world: 'World', callback: SystemCallback):
+        self._ptr = None
+        # The raw world owns the callback, so only hold a weak reference back
+        # to avoid a cycle the garbage collector cannot see through.
+        self._world = weakref.proxy(world)
+        self._callback = callback
+        self._plan = None
+        self._stats = None
+
+    def _bind(self, ptr):
+        """
+        Attaches the raw system once flecs has created it. The callback can
+        only be registered before the system exists, so the components are
+        resolved afterwards.
+        """
+        self._ptr = ptr
+        self._plan = IterPlan(resolve_components(ptr, self._world))
+        self._world.track_query(self)
+        if self._world.stats_enabled:
+            self.enable_stats()
+
+    def _run(self, it):
+        if self._stats is None:
+            self._callback(FilterIter(it, self._world, self._plan))
+        else:
+            self._run_timed(it)
+
+    def _run_timed(self, it):
+        stats = self._stats
+        stats.tables += 1
+        stats.entities += it.count()
+        start = perf_counter()
+        try:
+            self._callback(TimedFilterIter(it, self._world, self._plan,
+                                           stats))
+        finally:
+            stats.body_time += perf_counter() - start
+
+    @property
+    def label(self) -> str:
+        """
+        Describes the system by the name of its callback.
+        """
+        return getattr(self._callback, '__qualname__', repr(self._callback))
+
+    def enable_stats(self, enabled: bool = True):
+        """
+        Enables recording the tables and entities the system visits, the
+        views it creates and the time spent in the callback. flecs advances
+        the iteration itself, so iter_time stays zero. The counters are only
+        approximate for multi-threaded systems.
+
+        Args:
+            enabled: False to stop recording and drop the counters.
+        """
+        if enabled:
+            if self._stats is None:
+                self._stats = IterStats()
+            self._world.track_stats(self)
+        else:
+            self._stats = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the counters recorded since stats were enabled, or an empty
+        dict if stats are disabled.
+        """
+        return {} if self._stats is None else self._stats.as_dict()
+
+    @property
+    def ptr(self):
+        return self._ptr
+
+    @property
+    def entity(self) -> Entity:
+        """
+        Returns the entity associated with the system.
+        """
+        return self._world.lookup_by_id(self._ptr.raw())
+
+
+class SystemBuilder(FilterBuilder):
+    """
+    Provides a builder for a system. The same as a filter builder, but also
+    takes the callback and the pipeline phase the system runs in.
+    """
+    def __init__(self, world: 'World', callback: SystemCallback, *args,
+                 phase: Optional[Entity] = None, multi_threaded: bool = False,
+                 **kwargs):
+        super().__init__(world, *args, **kwargs)
+        self._callback = callback
+        self._phase = phase
+        self._multi_threaded = multi_threaded
+
+    @property
+    def phase(self) -> Optional[Entity]:
+        return self._phase
+
+    @phase.setter
+    def phase(self, val: Entity):
+        """
+        Sets the pipeline phase. Defaults to OnUpdate when not set.
+
+        Args:
+            val: The phase entity, such as World.on_update_entity.
+        """
+        self._phase = val
+
+    @property
+    def multi_threaded(self) -> bool:
+        return self._multi_threaded
+
+    @multi_threaded.setter
+    def multi_threaded(self, val: bool):
+        """
+        Sets whether the matched tables are split across the world's worker
+        threads. The callback then runs concurrently for different tables,
+        holding the GIL only while Python code executes.
+
+        Args:
+            val: True to run the system on multiple threads.
+        """
+        self._multi_threaded = val
+
+    def build(self) -> System:
+        system = System(self._world, self._callback)
+        phase = 0 if self._phase is None else int(self._phase)
+        ptr = self._world.ptr.create_system(self._name, self._expr,
+                                            self._instanced, self._terms,
+                                            phase, self._multi_threaded,
+                                            system._run)
+        system._bind(ptr)
+        return system
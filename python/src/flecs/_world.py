@@ -2,17 +2,32 @@
 Provides access to the flecs world. This should approximately match the
 flecs::world C++ API.
 """
-from typing import Optional, Union
+import itertools
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator,
+                    List, Optional, Tuple, Union)
 
 import numpy as np
 import numpy.typing as npt
 
 import flecs._flecs as _flecs
-from ._entity import Entity, Pair, BulkEntityBuilder
+from ._entity import Entity, EntityLike, Pair, BulkEntityBuilder
 from ._component import Component
 from ._types import ShapeLike
-from ._filter import FilterBuilder, FilterIter, Term, ComponentEntry
+from ._filter import (Filter, FilterBuilder, FilterIter, Term,
+                      ComponentEntry, IterPlan, resolve_components)
 from ._query import QueryBuilder
+from ._system import System, SystemBuilder, SystemCallback
+from ._observer import Observer, ObserverBuilder, ObserverCallback, EventLike
+from ._snapshot import Snapshot
+from ._checkpoint import PathLike, save_world, load_world
+from ._arrow import (ENTITY_COLUMN, import_pyarrow, iter_record_batches,
+                     record_batch_columns)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
 
 
 class World:
@@ -20,36 +35,142 @@ class World:
     Wraps the Flecs World concept using an API similar to the C++ flecs::world
     API.
     """
-    def __init__(self):
+    def __init__(self, id_cache_size: int = 65536,
+                 filter_cache_size: int = 256):
+        """
+        Creates the world.
+
+        Args:
+            id_cache_size: The maximum number of id to wrapper mappings kept
+                by lookup_by_id. The least recently used are evicted first.
+            filter_cache_size: The maximum number of built filters and
+                queries kept for reuse by their builders. The least recently
+                used are evicted first. Zero disables the cache.
+        """
         self._ptr = _flecs.world()
 
-        # Also store a dictionary of all components.
+        # Also store a dictionary of all components and tags.
         self._components = {}
+        self._tags = {}
+
+        # Cache of wrappers resolved by lookup_by_id, in LRU order.
+        self._id_cache = OrderedDict()
+        self._id_cache_size = id_cache_size
+        self._pair_ids = {}
+
+        # Built filters and queries by builder signature, in LRU order.
+        self._filter_cache = OrderedDict()
+        self._filter_cache_size = filter_cache_size
+
+        # Filters, queries and systems, and those with stats enabled
+        self._queries = weakref.WeakSet()
+        self._stats_enabled = False
+        self._instrumented = weakref.WeakSet()
 
     @property
     def ptr(self):
+        if self._ptr is None:
+            raise RuntimeError("Attempting to use a world which is closed.")
         return self._ptr
 
+    def __enter__(self) -> 'World':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Deletes the world. Filters and queries created from it are closed, and
+        using the world or its entities afterwards raises a RuntimeError.
+
+        Views into component storage remain valid: they keep the storage
+        alive, so flecs only frees it once the last view, iterator, filter
+        and snapshot referring to the world is released. Without any, the
+        world is freed immediately.
+        """
+        if self._ptr is None:
+            return
+        for obj in list(self._queries):
+            if isinstance(obj, Filter):
+                obj.close()
+
+        for ptr, _ in self._filter_cache.values():
+            ptr.close()
+        self._filter_cache.clear()
+        self._ptr = None
+        self._components.clear()
+        self._tags.clear()
+        self._id_cache.clear()
+        self._pair_ids.clear()
+
+    @property
+    def closed(self) -> bool:
+        return self._ptr is None
+
     @property
     def prefab_entity(self) -> Entity:
         """
         Returns the EcsPrefab entity.
         """
-        return Entity(self._ptr.EcsPrefab())
+        return Entity(self.ptr.EcsPrefab(), self)
 
     @property
     def childof_entity(self) -> Entity:
         """
         Returns the EcsChildOf entity.
         """
-        return Entity(self._ptr.EcsChildOf())
+        return Entity(self.ptr.EcsChildOf(), self)
 
     @property
     def isa_entity(self) -> Entity:
         """
         Returns the EcsChildOf entity.
         """
-        return Entity(self._ptr.EcsIsA())
+        return Entity(self.ptr.EcsIsA(), self)
+
+    @property
+    def pre_update_entity(self) -> Entity:
+        """
+        Returns the EcsPreUpdate pipeline phase.
+        """
+        return Entity(self.ptr.EcsPreUpdate(), self)
+
+    @property
+    def on_update_entity(self) -> Entity:
+        """
+        Returns the EcsOnUpdate pipeline phase. Systems run in this phase by
+        default.
+        """
+        return Entity(self.ptr.EcsOnUpdate(), self)
+
+    @property
+    def post_update_entity(self) -> Entity:
+        """
+        Returns the EcsPostUpdate pipeline phase.
+        """
+        return Entity(self.ptr.EcsPostUpdate(), self)
+
+    @property
+    def on_add_event(self) -> Entity:
+        """
+        Returns the EcsOnAdd event.
+        """
+        return Entity(self.ptr.EcsOnAdd(), self)
+
+    @property
+    def on_remove_event(self) -> Entity:
+        """
+        Returns the EcsOnRemove event.
+        """
+        return Entity(self.ptr.EcsOnRemove(), self)
+
+    @property
+    def on_set_event(self) -> Entity:
+        """
+        Returns the EcsOnSet event.
+        """
+        return Entity(self.ptr.EcsOnSet(), self)
 
     def prefab(self) -> Entity:
         """
@@ -58,9 +179,9 @@ class World:
         Returns:
             The EcsPrefab entity.
         """
-        return Entity(self._ptr.entity(self.prefab_entity.ptr))
+        return Entity(self.ptr.entity(int(self.prefab_entity)), self)
 
-    def entity(self, arg: Optional[Union[str, Entity]] = None) -> Entity:
+    def entity(self, arg: Optional[Union[str, EntityLike]] = None) -> Entity:
         """
         Creates an entity with the given name.
 
@@ -72,47 +193,157 @@ class World:
             The entity object.
         """
         if arg is not None:
-            if isinstance(arg, Entity):
-                arg = arg.ptr
-            e = self._ptr.entity(arg)
+            if not isinstance(arg, str):
+                arg = int(arg)
+            e = self.ptr.entity(arg)
         else:
-            e = self._ptr.entity()
-        return Entity(e)
+            e = self.ptr.entity()
+        return Entity(e, self)
 
-    def bulk_entity_w_id(self, eid: Union[Pair, Entity], count: int):
-        results = self._ptr.bulk_entity_w_id(eid.ptr.raw(), count)
-        return [Entity(val) for val in results]
+    def entities_from_ids(self, ids: npt.ArrayLike) -> List[Entity]:
+        """
+        Wraps each id of an id array in an Entity.
+
+        Args:
+            ids: The entity ids, such as those returned by bulk creation.
+
+        Returns:
+            The list of entities.
+        """
+        return [Entity(int(val), self) for val in ids]
+
+    def bulk_entity_w_id(self, eid: EntityLike, count: int,
+                         as_array: bool = False
+                         ) -> Union[List[Entity], np.ndarray]:
+        """
+        Creates count entities, each with the given id.
+
+        Args:
+            eid: The component, tag or pair to add to each entity.
+            count: The number of entities to create.
+            as_array: If true, returns the ids as a uint64 array instead of
+                wrapping each one in an Entity.
+
+        Returns:
+            The created entities.
+        """
+        ids = self.ptr.bulk_entity_w_id(int(eid), count)
+        return ids if as_array else self.entities_from_ids(ids)
 
     def bulk_entity_builder(self, count: int):
-        result = self._ptr.bulk_entity_builder(count)
-        return BulkEntityBuilder(result)
+        result = self.ptr.bulk_entity_builder(count)
+        return BulkEntityBuilder(result, self)
 
-    def pair(self, e: Entity, other: Entity) -> Pair:
-        return Pair(self._ptr.pair(e.ptr, other.ptr), e, other)
+    def pair(self, e: EntityLike, other: EntityLike) -> Pair:
+        if not isinstance(e, Entity):
+            e = self.lookup_by_id(int(e))
+        if not isinstance(other, Entity):
+            other = self.lookup_by_id(int(other))
+        return Pair(self.ptr.pair(int(e), int(other)), self, e, other)
 
     def lookup(self, name: str) -> Optional[Entity]:
         if name in self._components:
             return self._components[name]
-        ptr = self._ptr.lookup(name)
-        return None if ptr.raw() == 0 else Entity(ptr)
+        e = self.ptr.lookup(name)
+        return None if e == 0 else Entity(e, self)
 
     def lookup_path(self, name: str) -> Optional[Entity]:
-        ptr = self._ptr.lookup_path(name)
-        return None if ptr.raw() == 0 else Entity(ptr)
-
-    def lookup_by_id(self, eid: int) -> Union[Entity, Pair]:
-        eid = self._ptr.lookup_by_id(eid)
-        if eid.is_pair():
-            relation = self.lookup_by_id(eid.relation().raw())
-            object = self.lookup_by_id(eid.object().raw())
-            return Pair(eid, relation, object)
+        e = self.ptr.lookup_path(name)
+        return None if e == 0 else Entity(e, self)
+
+    def lookup_by_id(self, eid: EntityLike) -> Union[Entity, Pair]:
+        """
+        Returns the wrapper for an id. Wrappers are cached, so resolving the
+        same id repeatedly only costs a dictionary lookup. Deleting through
+        Entity.destruct, Filter.bulk_delete or World.restore drops the cached
+        wrappers of every deleted entity, including children deleted with
+        their parent; deleting through the low-level ptr does not.
+
+        Args:
+            eid: The entity, component or pair id.
+
+        Returns:
+            The Entity, Component or Pair for the id.
+        """
+        eid = int(eid)
+        cache = self._id_cache
+        result = cache.get(eid)
+        if result is not None:
+            cache.move_to_end(eid)
+            return result
+
+        result = self._resolve_id(eid)
+        self._cache_id(eid, result)
+        return result
+
+    def _resolve_id(self, eid: int) -> Union[Entity, Pair]:
+        ptr = self.ptr.lookup_by_id(eid)
+        if ptr.is_pair():
+            relation = self.lookup_by_id(ptr.relation().raw())
+            object = self.lookup_by_id(ptr.object().raw())
+            return Pair(eid, self, relation, object)
         else:
-            e = eid.as_entity()
-            name = e.name()
+            name = self.ptr.entity_name(eid)
             if name in self._components:
                 return self._components[name]
             else:
-                return Entity(e)
+                return Entity(eid, self)
+
+    def _cache_id(self, eid: int, wrapper: Union[Entity, Pair]):
+        cache = self._id_cache
+        cache[eid] = wrapper
+        cache.move_to_end(eid)
+        if isinstance(wrapper, Pair):
+            # Pair ids do not carry the generation of their target, so track
+            # them to drop them when either side is deleted.
+            for e in (wrapper.relation, wrapper.object):
+                self._pair_ids.setdefault(int(e), set()).add(eid)
+
+        while len(cache) > self._id_cache_size:
+            old_id, old = cache.popitem(last=False)
+            if isinstance(old, Pair):
+                for e in (old.relation, old.object):
+                    self._pair_ids.get(int(e), set()).discard(old_id)
+
+    def invalidate(self, eid: EntityLike):
+        """
+        Drops any cached wrapper for the id, along with cached pairs that
+        refer to it. Called when an entity is deleted.
+
+        Args:
+            eid: The id to drop.
+        """
+        eid = int(eid)
+        self._id_cache.pop(eid, None)
+        for pair_id in self._pair_ids.pop(eid, ()):
+            self._id_cache.pop(pair_id, None)
+
+    def invalidate_many(self, ids: np.ndarray):
+        """
+        Drops any cached wrapper for many deleted ids, as invalidate does.
+
+        Args:
+            ids: The deleted ids as a uint64 array.
+        """
+        if not self._id_cache:
+            return
+        cached = np.fromiter(itertools.chain(self._id_cache, self._pair_ids),
+                             dtype=np.uint64)
+        for eid in np.intersect1d(ids, cached):
+            self.invalidate(int(eid))
+
+    def descendants(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Returns the entities flecs deletes along with the given ones, which
+        are their children and, recursively, their children's children.
+
+        Args:
+            ids: The entity ids as a uint64 array.
+
+        Returns:
+            The descendant ids as a uint64 array.
+        """
+        return self.ptr.descendants(ids)
 
     def component(self, name: str, dtype: npt.DTypeLike,
                   shape: ShapeLike = 1) -> Component:
@@ -132,10 +363,11 @@ class World:
         if name in self._components:
             return self._components[name]
         dtype = np.dtype(dtype)
-        nbytes = np.prod(shape) * dtype.itemsize
-        raw_component = self._ptr.component(name, nbytes, dtype.alignment)
-        c = Component(raw_component, dtype, shape)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        raw_component = self.ptr.component(name, nbytes, dtype.alignment)
+        c = Component(raw_component, self, dtype, shape)
         self._components[name] = c
+        self._cache_id(int(c), c)
         return c
 
     def component_from_example(self, name: str, example: npt.ArrayLike):
@@ -151,10 +383,11 @@ class World:
         """
         if name in self._components:
             return self._components[name]
-        raw_component = self._ptr.component(name, example.nbytes,
+        raw_component = self.ptr.component(name, example.nbytes,
                                             example.dtype.alignment)
-        c = Component(raw_component, example.dtype, example.shape)
+        c = Component(raw_component, self, example.dtype, example.shape)
         self._components[name] = c
+        self._cache_id(int(c), c)
         return c
 
     def tag(self, name: str) -> Entity:
@@ -166,8 +399,43 @@ class World:
         Returns:
             The component representing the tag.
         """
-        c = self._ptr.component(name, 0, 0)
-        return Entity(c)
+        if name in self._tags:
+            return self._tags[name]
+        c = self.ptr.component(name, 0, 0)
+        e = Entity(c, self)
+        self._tags[name] = e
+        return e
+
+    def cached_filter(self, signature: tuple,
+                      create: Callable[[], Any]) -> Optional[tuple]:
+        """
+        Returns the compiled filter for the signature and its iteration plan,
+        compiling it on the first request, or None if the cache is disabled.
+
+        Evicting an entry only drops the cache's reference, so an evicted
+        filter is finalized once no Filter object uses it any more, or right
+        away if none does.
+
+        Args:
+            signature: The builder signature.
+            create: Compiles the filter when it is not cached.
+
+        Returns:
+            The compiled filter and its IterPlan.
+        """
+        if self._filter_cache_size <= 0:
+            return None
+
+        cache = self._filter_cache
+        entry = cache.get(signature)
+        if entry is None or entry[0].is_closed():
+            ptr = create()
+            entry = (ptr, IterPlan(resolve_components(ptr, self)))
+            cache[signature] = entry
+        cache.move_to_end(signature)
+        while len(cache) > self._filter_cache_size:
+            cache.popitem(last=False)
+        return entry
 
     def filter_builder(self, *args, **kwargs) -> FilterBuilder:
         """
@@ -181,6 +449,446 @@ class World:
         """
         return QueryBuilder(self, *args, **kwargs)
 
+    def system_builder(self, callback: SystemCallback, *args,
+                       **kwargs) -> SystemBuilder:
+        """
+        Creates a system builder, which allows the user to setup a system.
+        """
+        return SystemBuilder(self, callback, *args, **kwargs)
+
+    def system(self, callback: SystemCallback, *args, **kwargs) -> System:
+        """
+        Creates a system which runs the callback every time the world
+        progresses. The callback is invoked once per matched table with a
+        FilterIter positioned at that table.
+
+        Args:
+            callback: The function to run for each matched table.
+            *args: The terms of the system, as for filter_builder.
+            **kwargs: The expr, name, instanced, phase and multi_threaded
+                options of the system.
+
+        Returns:
+            The system.
+        """
+        return self.system_builder(callback, *args, **kwargs).build()
+
+    def observer_builder(self, events: Iterable[EventLike], *args,
+                         callback: ObserverCallback,
+                         **kwargs) -> ObserverBuilder:
+        """
+        Creates an observer builder, which allows the user to setup an
+        observer.
+        """
+        return ObserverBuilder(self, events, *args, callback=callback,
+                               **kwargs)
+
+    def observer(self, events: Iterable[EventLike], *args,
+                 callback: ObserverCallback, **kwargs) -> Observer:
+        """
+        Creates an observer which runs the callback when one of the events
+        occurs for entities matching the terms. The callback is invoked once
+        per table batch, not once per entity, with a FilterIter holding the
+        affected rows: entity_ids gives their ids and indexing gives the
+        component views.
+
+        Exceptions raised by the callback cannot be propagated through the
+        operation that triggered it, so they are reported through
+        sys.unraisablehook instead.
+
+        Args:
+            events: 'OnAdd', 'OnRemove', 'OnSet' or event entities.
+            *args: The terms of the observer, as for filter_builder.
+            callback: The function to run for each batch.
+            **kwargs: The expr and name of the observer.
+
+        Returns:
+            The observer.
+        """
+        return self.observer_builder(events, *args, callback=callback,
+                                     **kwargs).build()
+
+    def progress(self, delta_time: float = 0.0) -> bool:
+        """
+        Runs a single frame, executing every system in pipeline order.
+
+        Args:
+            delta_time: The time elapsed since the last frame. If zero, flecs
+                measures the time itself.
+
+        Returns:
+            False if the application has requested to quit.
+        """
+        return self.ptr.progress(delta_time)
+
+    def set_threads(self, threads: int):
+        """
+        Sets the number of worker threads used by progress to run
+        multi-threaded systems.
+
+        Args:
+            threads: The number of threads.
+        """
+        self.ptr.set_threads(threads)
+
+    @contextmanager
+    def deferred(self) -> Iterator['World']:
+        """
+        Queues structural changes, such as add, set, remove, is_a and
+        destruct, until the end of the block and then merges them in one pass.
+        This also makes it safe to modify entities while iterating a filter,
+        as the tables being iterated do not change until the block exits.
+        Blocks may be nested; changes are merged when the outermost exits.
+
+        Example:
+            with world.deferred():
+                for it in filter:
+                    for e in it.entities:
+                        e.add(tag)
+        """
+        self.ptr.defer_begin()
+        try:
+            yield self
+        finally:
+            self.ptr.defer_end()
+
+    @property
+    def is_deferred(self) -> bool:
+        return self.ptr.is_deferred()
+
+    @property
+    def stats_enabled(self) -> bool:
+        return self._stats_enabled
+
+    def enable_stats(self, enabled: bool = True):
+        """
+        Enables stats on every filter, query and system created afterwards.
+        Stats can also be enabled on a single object with its enable_stats.
+
+        Args:
+            enabled: False to create objects without stats again.
+        """
+        self._stats_enabled = enabled
+
+    def track_query(self, obj):
+        """
+        Counts a filter, query or system in stats while it is alive. Called
+        when the object is created.
+        """
+        self._queries.add(obj)
+
+    def track_stats(self, obj):
+        """
+        Adds a filter, query or system to the stats report. Called when stats
+        are enabled on the object.
+        """
+        self._instrumented.add(obj)
+
+    def stats_report(self) -> List[Dict[str, Any]]:
+        """
+        Returns the stats of every live filter, query and system with stats
+        enabled, slowest first. Each entry holds the counters of its stats()
+        along with its kind and label.
+        """
+        report = []
+        for obj in list(self._instrumented):
+            stats = obj.stats()
+            if stats:
+                report.append({'kind': type(obj).__name__,
+                               'label': obj.label, **stats})
+        report.sort(key=lambda val: val['iter_time'] + val['body_time'],
+                    reverse=True)
+        return report
+
+    def _iter_tables(self) -> Iterator:
+        """
+        Visits each table holding a prefab, or a component or tag created
+        through the world, once, yielding the raw iterator positioned on it.
+        """
+        # Prefab and disabled tables are only matched when asked for, and
+        # prefabs are visited even when they hold no component of the world.
+        seen = set()
+        roots = (self.prefab_entity, *self._components.values(),
+                 *self._tags.values())
+        for e in roots:
+            # Compiled directly rather than through the filter cache, so
+            # walking the tables leaves the cache to the user's filters.
+            f = self.ptr.create_filter('', '?Prefab, ?Disabled', False,
+                                       [Term(e).ptr])
+            it = f.iter()
+            while it.next():
+                ids = tuple(int(eid) for eid in it.table_type())
+                if ids not in seen:
+                    seen.add(ids)
+                    yield it
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns counters describing the world and where its memory goes:
+            entity_count: The prefabs, and the entities in tables holding a
+                component or tag created through the world.
+            query_count: The live filters, queries and systems.
+            id_count, component_id_count, pair_id_count: The ids in use.
+            table_count, empty_table_count: The tables, and those holding no
+                entities, which compact deletes.
+            ids_created, ids_deleted: The ids created and deleted so far,
+                whose difference shows how often ids were recycled.
+            tables_created, tables_deleted: The tables created and deleted.
+            last_id: The highest entity id issued.
+            components: Per component name, the tables storing it, the
+                entities in those tables and the bytes of their columns.
+        """
+        components = {name: {'tables': 0, 'entities': 0, 'bytes_used': 0}
+                      for name in self._components}
+        by_id = {int(c): components[name]
+                 for name, c in self._components.items()}
+        entity_count = 0
+        for it in self._iter_tables():
+            count = it.count()
+            entity_count += count
+            for eid in it.table_type():
+                entry = by_id.get(int(eid))
+                if entry is not None:
+                    entry['tables'] += 1
+                    entry['entities'] += count
+                    entry['bytes_used'] += len(it.table_column(eid))
+
+        return {'entity_count': entity_count,
+                'query_count': len(self._queries),
+                **self.ptr.info(),
+                'components': components}
+
+    def compact(self) -> int:
+        """
+        Frees memory after many entities were deleted, by deleting the tables
+        holding no entities. The columns of the remaining tables keep their
+        capacity.
+
+        Returns:
+            The number of tables deleted.
+        """
+        return self.ptr.delete_empty_tables()
+
+    def snapshot(self, filter: Optional[Filter] = None) -> Snapshot:
+        """
+        Captures the state of the world, or of the tables matched by a filter,
+        so it can be restored later.
+
+        Args:
+            filter: If given, only the entities matched by the filter are
+                captured.
+
+        Returns:
+            The snapshot.
+        """
+        return Snapshot(self._take_snapshot(filter), self, filter)
+
+    def _take_snapshot(self, filter: Optional[Filter]):
+        if filter is None:
+            return self.ptr.snapshot()
+        return self.ptr.snapshot(filter.ptr.iter())
+
+    def restore(self, snapshot: Snapshot, keep: bool = False):
+        """
+        Restores the world to the state it was in when the snapshot was taken.
+        The snapshot's data is moved into the world, so it cannot be restored
+        a second time unless it is kept.
+
+        Args:
+            snapshot: The snapshot to restore.
+            keep: If true, the restored state is captured again into the same
+                snapshot, so it can be restored repeatedly, for example to roll
+                back every frame. This costs as much as taking a new snapshot.
+        """
+        snapshot.ptr.restore()
+        if keep:
+            snapshot.replace(self._take_snapshot(snapshot.filter))
+
+        # Entities may have been deleted or revived, so drop cached wrappers
+        self._id_cache.clear()
+        self._pair_ids.clear()
+
+    def save(self, path: PathLike):
+        """
+        Writes the entities to a file, one block per component for each table.
+        Only the components and tags created through this world are saved,
+        along with the pairs built from them; other data, such as entity names,
+        is not.
+
+        Args:
+            path: The file to write.
+        """
+        save_world(self, path)
+
+    def load(self, path: PathLike):
+        """
+        Loads the entities written by save. The file is memory mapped and each
+        table is created with a single bulk operation, so loading is bound by
+        disk bandwidth rather than by the number of entities. Entities keep
+        their ids, so the ids may not already be in use in this world.
+
+        Args:
+            path: The file to read.
+        """
+        load_world(self, path)
+
+    def spawn_record_batches(
+            self, batches: Union['pa.RecordBatch', 'pa.Table',
+                                 Iterable['pa.RecordBatch']],
+            keep_ids: bool = False) -> np.ndarray:
+        """
+        Creates entities from Arrow record batches, such as those returned by
+        Filter.to_record_batches, with one bulk creation per batch. Every
+        column other than 'entity' must be named after an existing component.
+        Requires pyarrow.
+
+        Args:
+            batches: A record batch, a table or an iterable of record batches.
+            keep_ids: If true, the entities are created with the ids in the
+                'entity' column, which may not already be in use.
+
+        Returns:
+            The ids of the created entities as a uint64 array.
+        """
+        pa = import_pyarrow()
+        results = []
+        for batch in iter_record_batches(pa, batches):
+            components = []
+            for name in batch.schema.names:
+                if name == ENTITY_COLUMN:
+                    continue
+                c = self._components.get(name, None)
+                if c is None:
+                    raise RuntimeError(f"Attempting to spawn component {name} "
+                                       f"which does not exist.")
+                components.append(c)
+
+            builder = self.bulk_entity_builder(batch.num_rows)
+            if keep_ids:
+                index = batch.schema.get_field_index(ENTITY_COLUMN)
+                if index < 0:
+                    raise RuntimeError("Attempting to keep entity ids from a "
+                                       "record batch without an entity "
+                                       "column.")
+                ids = batch.column(index).to_numpy()
+                builder.set_entities(ids.astype(np.uint64, copy=False))
+            values = record_batch_columns(batch, components)
+            for c, data in zip(components, values):
+                builder.add(c, data.view('uint8'))
+            results.append(builder.build(as_array=True))
+        if not results:
+            return np.empty(0, dtype=np.uint64)
+        return np.concatenate(results)
+
+    def spawn_columns(
+            self, columns: Dict[Union[str, EntityLike],
+                                Union[np.ndarray,
+                                      Tuple[np.ndarray, np.ndarray]]],
+            count: Optional[int] = None) -> np.ndarray:
+        """
+        Creates entities from columns where rows may differ in which ids
+        they have. Rows are grouped by the ids they end up with, and each
+        group is created with one bulk creation.
+
+        Each key is an id or the name of an entity, with as value either:
+            For a component, an array of shape (N, *shape) with its dtype,
+            or a (values, mask) tuple where rows with a false mask do not
+            get the component.
+            For a tag, pair or prefab, a boolean mask of shape (N,), or an
+            integer array of the rows that get it. Rows given a prefab are
+            created as instances of it.
+
+        Args:
+            columns: The columns by id.
+            count: The number of entities. Only needed when no column has
+                one value per row.
+
+        Returns:
+            The ids of the created entities as a uint64 array, in row order.
+        """
+        if not columns:
+            raise RuntimeError("Attempting to spawn without columns.")
+
+        def resolve(e: Union[str, EntityLike]) -> Union[Entity, Pair]:
+            if isinstance(e, (Entity, Pair)):
+                return e
+            if isinstance(e, str):
+                found = self.lookup(e)
+                if found is None:
+                    raise RuntimeError(f"Attempting to spawn {e} which does "
+                                       f"not exist.")
+                return found
+            return self.lookup_by_id(e)
+
+        columns = {resolve(e): val for e, val in columns.items()}
+
+        # The row count is taken from the first column with a value per row
+        if count is None:
+            for e, val in columns.items():
+                if getattr(e, 'is_component', False):
+                    count = len(val[0] if isinstance(val, tuple) else val)
+                    break
+                val = np.asarray(val)
+                if val.dtype == np.bool_:
+                    count = len(val)
+                    break
+            else:
+                raise RuntimeError("Attempting to spawn from row indices "
+                                   "without a count.")
+
+        def row_mask(val: npt.ArrayLike) -> np.ndarray:
+            val = np.asarray(val)
+            if val.dtype == np.bool_:
+                if val.shape != (count,):
+                    raise RuntimeError(f"Expected a mask of shape "
+                                       f"({count},), got {val.shape}")
+                return val
+            mask = np.zeros(count, dtype=bool)
+            mask[val] = True
+            return mask
+
+        ids = []
+        values = []
+        masks = []
+        for e, val in columns.items():
+            if getattr(e, 'is_component', False):
+                data, mask = val if isinstance(val, tuple) else (val, None)
+                if data.dtype != e.dtype or data.shape != (count, *e.shape):
+                    raise RuntimeError(f"Attempting to spawn component "
+                                       f"{e.name} of dtype {e.dtype} and "
+                                       f"shape {e.shape} from values with "
+                                       f"dtype {data.dtype} and shape "
+                                       f"{data.shape}")
+                ids.append(e)
+                values.append(data)
+                masks.append(np.ones(count, dtype=bool) if mask is None
+                             else row_mask(mask))
+            else:
+                if not isinstance(e, Pair) and self.ptr.entity_has(
+                        int(e), int(self.prefab_entity)):
+                    e = self.pair(self.isa_entity, e)
+                ids.append(e)
+                values.append(None)
+                masks.append(row_mask(val))
+
+        # Group the rows by signature, keeping row order within a group
+        signatures, inverse = np.unique(np.stack(masks, axis=1), axis=0,
+                                        return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order],
+                                 np.arange(len(signatures) + 1))
+
+        result = np.empty(count, dtype=np.uint64)
+        for group, signature in enumerate(signatures):
+            rows = order[bounds[group]:bounds[group + 1]]
+            builder = self.bulk_entity_builder(len(rows))
+            for e, data, has in zip(ids, values, signature):
+                if has:
+                    builder.add(e, None if data is None else data[rows])
+            result[rows] = builder.build(as_array=True)
+        return result
+
     def set(self, component: Union[str, Component], data: np.ndarray):
         """
         Sets the singleton value in the world.
@@ -194,7 +902,7 @@ class World:
             component = self._components.get(name, None)
             if component is None:
                 component = self.component_from_example(name, data)
-        self._ptr.set(component.ptr, data.view('uint8'))
+        self.ptr.set(int(component), data.view('uint8'))
 
     def get(self, component: Union[str, Component]) -> np.ndarray:
         """
@@ -212,7 +920,86 @@ class World:
             if component is None:
                 raise RuntimeError(f"Attempting to get component {component} "
                                    f"singleton which does not exist.")
-        return component.create_view(self._ptr.get(component.ptr))[0]
+        return component.create_view(self.ptr.get(int(component)))[0]
+
+    def get_many(self, component: Union[str, Component], ids: npt.ArrayLike,
+                 return_mask: bool = False
+                 ) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Gets the component of many entities with a single call. The values
+        are copied into one array, so it does not change with the entities.
+
+        Args:
+            component: The component or component name to retrieve.
+            ids: The entity ids.
+            return_mask: If true, ids which are not alive or do not have the
+                component are allowed. Their rows are zeroed and a boolean
+                mask of the ids that have the component is also returned.
+
+        Returns:
+            An array of shape (N, *shape) with the component dtype, and the
+            mask if return_mask is set.
+        """
+        component = self._resolve_component(component)
+        ids = np.asarray(ids, dtype=np.uint64)
+        data, mask = self.ptr.get_many(int(component), ids, return_mask)
+        result = component.create_view(data)
+        return (result, mask) if return_mask else result
+
+    def set_many(self, component: Union[str, Component], ids: npt.ArrayLike,
+                 values: np.ndarray):
+        """
+        Sets the component of many entities with a single call, adding it
+        where missing. The values are validated once for the whole batch.
+
+        Args:
+            component: The component or component name to set.
+            ids: The entity ids.
+            values: An array of shape (N, *shape) with the component dtype,
+                one row per id.
+        """
+        c = self._resolve_component(component)
+        ids = np.asarray(ids, dtype=np.uint64)
+        if values.dtype != c.dtype:
+            raise RuntimeError(f"Attempting to set component {c.name} of "
+                               f"dtype {c.dtype} from values with dtype "
+                               f"{values.dtype}")
+        if values.shape != (len(ids), *c.shape):
+            raise RuntimeError(f"Attempting to set component {c.name} of "
+                               f"shape {c.shape} on {len(ids)} entities from "
+                               f"values with shape {values.shape}")
+        values = np.ascontiguousarray(values)
+        self.ptr.set_many(int(c), ids, values.view('uint8').reshape(-1))
+
+    def add_many(self, e: EntityLike, ids: npt.ArrayLike):
+        """
+        Adds a tag, component or pair to many entities with a single call.
+
+        Args:
+            e: The id to add.
+            ids: The entity ids.
+        """
+        self.ptr.add_many(int(e), np.asarray(ids, dtype=np.uint64))
+
+    def remove_many(self, e: EntityLike, ids: npt.ArrayLike):
+        """
+        Removes a tag, component or pair from many entities with a single
+        call.
+
+        Args:
+            e: The id to remove.
+            ids: The entity ids.
+        """
+        self.ptr.remove_many(int(e), np.asarray(ids, dtype=np.uint64))
+
+    def _resolve_component(self, component: Union[str, Component]
+                           ) -> Component:
+        if isinstance(component, str):
+            name = component
+            component = self._components.get(name, None)
+            if component is None:
+                raise RuntimeError(f"Component {name} does not exist.")
+        return component
 
     def each(self, term: Union[str, Component, Term]) -> FilterIter:
         """
@@ -234,8 +1021,9 @@ class World:
         if isinstance(term, Component):
             term = Term(term)
 
-        term_iter = self._ptr.create_term_iter(term.ptr)
+        term_iter = self.ptr.create_term_iter(term.ptr)
         component = self.lookup_by_id(term.id)
         # NOTE: term_iter seems to have two values: the component as well as
         # the
-        return FilterIter(term_iter, self, [ComponentEntry(component, 1)])
+        return FilterIter(term_iter, self,
+                          IterPlan([ComponentEntry(component, 1)]))
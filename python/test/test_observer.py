@@ -0,0 +1,51 @@
+"""
+Tests observers reacting to component changes.
+"""
+import numpy as np
+import flecs
+
+
+def test_observer_bulk():
+    """
+    Tests that an observer is invoked once per table batch.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+
+    batches = []
+
+    def on_set(it):
+        batches.append((it.entity_ids.copy(), it["Position"].copy()))
+
+    world.observer('OnSet', position, callback=on_set)
+
+    data = np.arange(3000, dtype='float32').reshape(1000, 3)
+    bulk_builder = world.bulk_entity_builder(1000)
+    bulk_builder.add(position, data)
+    ids = bulk_builder.build(as_array=True)
+
+    assert len(batches) == 1
+    np.testing.assert_array_equal(batches[0][0], ids)
+    np.testing.assert_array_equal(batches[0][1], data)
+
+
+def test_observer_events():
+    """
+    Tests observing adds and removes of a tag.
+    """
+    world = flecs.World()
+    dead = world.tag("Dead")
+
+    events = []
+
+    def on_change(it):
+        events.append((it.event, list(it.entity_ids)))
+
+    world.observer(['OnAdd', 'OnRemove'], dead, callback=on_change)
+
+    e = world.entity()
+    e.add(dead)
+    e.remove(dead)
+
+    assert events == [(world.on_add_event, [int(e)]),
+                      (world.on_remove_event, [int(e)])]
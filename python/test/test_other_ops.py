@@ -3,6 +3,7 @@ Tests various other operations needed.
 """
 
 import numpy as np
+import pytest
 import flecs
 
 
@@ -62,9 +63,16 @@ def test_bulk_prefab():
 
     for val in query:
         assert len(val) == 1000
-        # Just references
-        assert len(val["Position"]) == 1
-        assert len(val["Velocity"]) == 1
+        assert not val.is_owned("Position")
+        assert not val.is_owned(1)
+
+        # Read-only views of the prefab's values, without copies
+        pos = val["Position"]
+        assert pos.shape == (1000, 3)
+        assert pos.strides[0] == 0
+        assert not pos.flags.writeable
+        np.testing.assert_equal(pos, np.broadcast_to([1, 2, 3], (1000, 3)))
+        assert val.columns().Velocity.strides[0] == 0
 
 
 def test_bulk_create():
@@ -97,6 +105,37 @@ def test_bulk_create():
         np.testing.assert_array_equal(val["Position"], position_data)
 
 
+def test_bulk_create_ids():
+    """
+    Tests that bulk creation can return the ids as a uint64 array, and that
+    those ids can be used anywhere an entity is accepted.
+    """
+    world = flecs.World()
+
+    position = world.component("Position", 'float32', 3)
+    tag = world.tag("Tag")
+
+    ids = world.bulk_entity_w_id(position, 100, as_array=True)
+    assert ids.dtype == np.uint64
+    assert ids.shape == (100,)
+
+    bulk_builder = world.bulk_entity_builder(10)
+    bulk_builder.add(position, np.zeros((10, 3), dtype='float32'))
+    more_ids = bulk_builder.build(as_array=True)
+    assert len(more_ids) == 10
+
+    e = world.entity()
+    e.add(ids[0])
+    assert e.has(ids[0])
+    e.is_a(more_ids[0])
+    assert e.has(position)
+
+    entities = world.entities_from_ids(ids[:3])
+    entities[0].add(tag)
+    assert entities[0].has(tag)
+    assert int(entities[1]) == ids[1]
+
+
 def test_hierarchy_cascade_simple():
     """
     This tests the cascade modifier in-use with the hierarchy.
@@ -240,7 +279,647 @@ def test_hierarchy_cascade():
     assert num_iter == 3
 
 
+def test_run_parallel():
+    """
+    Tests that tables are partitioned across workers without overlap.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tags = [world.tag(f"Tag{idx}") for idx in range(8)]
+
+    for idx in range(800):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32'))
+        e.add(tags[idx % len(tags)])
+
+    query = world.query_builder(position).build()
+
+    # Each worker sees a disjoint subset of the tables
+    counts = [sum(len(val) for val in it) for it in query.worker_iters(3)]
+    assert sum(counts) == 800
+
+    def move(val):
+        val["Position"][:] += 1
+
+    query.run_parallel(move, 4)
+
+    for val in query:
+        np.testing.assert_array_equal(val["Position"], 1)
+
+
+def test_gather():
+    """
+    Tests that a component can be concatenated across all matched tables.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float32', 3)
+    good = world.tag("Good")
+
+    expected = []
+    expected_ids = []
+    for idx in range(30):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32') + idx)
+        if idx % 3 == 0:
+            e.set(velocity, np.ones(3, dtype='float32'))
+        if idx % 2 == 0:
+            e.add(good)
+            expected.append(np.zeros(3, dtype='float32') + idx)
+            expected_ids.append(int(e))
+
+    query = world.query_builder(position, good).build()
+    data, ids = query.gather(position, return_ids=True)
+
+    assert data.dtype == np.float32
+    assert data.shape == (15, 3)
+    assert ids.dtype == np.uint64
+
+    # Rows are ordered by table, so compare after sorting by id
+    order = np.argsort(ids)
+    np.testing.assert_array_equal(ids[order], expected_ids)
+    np.testing.assert_array_equal(data[order], np.vstack(expected))
+
+    # Filters gather the same way and accept the component name
+    filter = world.filter_builder(position, good).build()
+    np.testing.assert_array_equal(filter.gather("Position"), data)
+
+
+def test_scatter():
+    """
+    Tests that gathered data can be written back into the matched tables.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tags = [world.tag("A"), world.tag("B")]
+
+    for idx in range(20):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32') + idx)
+        e.add(tags[idx % 2])
+
+    query = world.query_builder(position).build()
+    data, ids = query.gather(position, return_ids=True)
+    query.scatter(position, data * 2, ids)
+
+    np.testing.assert_array_equal(query.gather(position), data * 2)
+
+    with pytest.raises(RuntimeError):
+        query.scatter(position, data.astype('float64'))
+
+    # Changing the layout invalidates the gathered ids
+    world.entity().set(position, np.zeros(3, dtype='float32'))
+    with pytest.raises(RuntimeError):
+        query.scatter(position, data, ids)
+
+
+def test_lookup_by_id_cache():
+    """
+    Tests that wrappers are cached by id and dropped on delete.
+    """
+    world = flecs.World(id_cache_size=4)
+    position = world.component("Position", 'float32', 3)
+    likes = world.tag("Likes")
+    e = world.entity("Bob")
+    other = world.entity("Alice")
+
+    assert world.lookup_by_id(int(position)) is position
+    assert world.lookup_by_id(int(e)) is world.lookup_by_id(int(e))
+
+    pair = world.lookup_by_id(int(world.pair(likes, other)))
+    assert pair is world.lookup_by_id(int(world.pair(likes, other)))
+
+    # The recycled id has a new generation, but pair ids only store the
+    # index of their target, so the cached pair must have been dropped.
+    other.destruct()
+    recycled = world.entity()
+    pair = world.lookup_by_id(int(world.pair(likes, recycled)))
+    assert pair.object == recycled
+
+    # The cache stays bounded
+    for _ in range(10):
+        world.lookup_by_id(int(world.entity()))
+    assert world.lookup_by_id(int(e)) == e
+
+
+def test_lookup_by_id_cache_cascade():
+    """
+    Tests that wrappers of children deleted along with their parent are
+    dropped from the cache.
+    """
+    world = flecs.World()
+    likes = world.tag("Likes")
+    tag = world.tag("Tag")
+
+    parent = world.entity()
+    child = world.entity()
+    parent.add_child(child)
+    world.lookup_by_id(int(world.pair(likes, child)))
+
+    parent.destruct()
+    assert not child.is_alive
+    # Either the parent's or the child's id may be recycled first
+    for recycled in (world.entity(), world.entity()):
+        pair = world.lookup_by_id(int(world.pair(likes, recycled)))
+        assert pair.object == recycled
+
+    # Deleting through a filter drops the children as well
+    parent = world.entity()
+    parent.add(tag)
+    child = world.entity()
+    parent.add_child(child)
+    world.lookup_by_id(int(world.pair(likes, child)))
+
+    world.filter_builder(tag).build().bulk_delete()
+    assert not child.is_alive
+    # Either the parent's or the child's id may be recycled first
+    for recycled in (world.entity(), world.entity()):
+        pair = world.lookup_by_id(int(world.pair(likes, recycled)))
+        assert pair.object == recycled
+
+
+def test_deferred():
+    """
+    Tests that structural changes are queued until the deferred block ends.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    dead = world.tag("Dead")
+
+    for idx in range(10):
+        world.entity().set(position, np.zeros(3, dtype='float32') + idx)
+
+    query = world.query_builder(position).build()
+
+    with world.deferred():
+        assert world.is_deferred
+        for val in query:
+            data = val["Position"]
+            for idx, e in enumerate(val.entities):
+                if data[idx, 0] % 2:
+                    e.add(dead)
+                else:
+                    e.destruct()
+            # Nothing has moved yet, so the views are still valid
+            assert len(val) == 10
+
+    assert not world.is_deferred
+    dead_query = world.query_builder(position, dead).build()
+    assert len(dead_query.gather(position)) == 5
+    assert len(query.gather(position)) == 5
+
+
+
+def test_query_changed():
+    """
+    Tests that a query only reports tables that were written to.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tags = [world.tag("A"), world.tag("B")]
+
+    entities = []
+    for idx in range(10):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32'))
+        e.add(tags[idx % 2])
+        entities.append(e)
+
+    reader = world.query_builder(expr='[in] Position').build()
+    writer = world.query_builder(tags[0], expr='[out] Position').build()
+
+    # Everything is new the first time
+    assert reader.changed()
+    assert sum(1 for _ in reader.iter_changed()) == 2
+    assert not reader.changed()
+
+    # Writing through Entity.set dirties only that table
+    entities[1].set(position, np.ones(3, dtype='float32'))
+    assert reader.changed()
+    changed = [val.entity_ids.copy() for val in reader.iter_changed()]
+    assert len(changed) == 1
+    assert int(entities[1]) in changed[0]
+
+    # Writing through the views of an [out] term dirties the table as well
+    for val in writer:
+        val["Position"][:] = 2
+    changed = [val.entity_ids.copy() for val in reader.iter_changed()]
+    assert len(changed) == 1
+    assert int(entities[0]) in changed[0]
+
+
+def test_snapshot():
+    """
+    Tests that a snapshot restores component data and deleted entities.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tag = world.tag("Tag")
+
+    entities = []
+    for idx in range(10):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32') + idx)
+        entities.append(e)
+    entities[0].add(tag)
+
+    query = world.query_builder(position).build()
+    expected = query.gather(position)
+
+    snapshot = world.snapshot()
+    for val in query:
+        val["Position"][:] = -1
+    entities[1].destruct()
+    entities[0].remove(tag)
+
+    snapshot.restore()
+    assert not snapshot.is_valid
+    assert entities[1].is_alive
+    assert entities[0].has(tag)
+    np.testing.assert_array_equal(np.sort(query.gather(position), axis=0),
+                                  np.sort(expected, axis=0))
+
+    # A kept snapshot rolls back repeatedly
+    snapshot = world.snapshot()
+    for _ in range(3):
+        entities[2].destruct()
+        world.restore(snapshot, keep=True)
+        assert snapshot.is_valid
+        assert entities[2].is_alive
+
+    # Without keep, the last restore consumes the snapshot
+    snapshot.restore()
+    assert not snapshot.is_valid
+    with pytest.raises(RuntimeError):
+        snapshot.restore()
+
+
+def test_snapshot_filter():
+    """
+    Tests that a filtered snapshot only restores the matched entities.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tag = world.tag("Tag")
+
+    tagged = world.entity().set(position, np.zeros(3, dtype='float32'))
+    tagged.add(tag)
+    other = world.entity().set(position, np.zeros(3, dtype='float32'))
 
+    snapshot = world.snapshot(world.filter_builder(position, tag).build())
+    tagged.set(position, np.ones(3, dtype='float32'))
+    other.set(position, np.ones(3, dtype='float32'))
+    world.restore(snapshot)
 
+    np.testing.assert_array_equal(tagged.get(position), 0)
+    np.testing.assert_array_equal(other.get(position), 1)
 
 
+def test_save_load(tmp_path):
+    """
+    Tests that saving and loading a world restores the tables.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float64', 2)
+    tag = world.tag("Tag")
+
+    builder = world.bulk_entity_builder(100)
+    builder.add(position, np.arange(300, dtype='float32').reshape(100, 3))
+    ids = builder.build(as_array=True)
+    moving = world.entity()
+    moving.set(position, np.ones(3, dtype='float32'))
+    moving.set(velocity, np.ones(2, dtype='float64'))
+    moving.add(tag)
+    moving.add_pair(tag, int(ids[0]))
+
+    path = tmp_path / "world.flecs"
+    world.save(path)
+
+    loaded = flecs.World()
+    loaded.load(path)
+    position = loaded.lookup("Position")
+    tag = loaded.tag("Tag")
+
+    query = loaded.query_builder(position).build()
+    data, loaded_ids = query.gather(position, return_ids=True)
+    order = np.argsort(loaded_ids)
+    assert set(loaded_ids) == set(ids) | {int(moving)}
+
+    expected = world.query_builder(world.lookup("Position")).build()
+    expected_data, expected_ids = expected.gather(world.lookup("Position"),
+                                                  return_ids=True)
+    np.testing.assert_array_equal(
+        data[order], expected_data[np.argsort(expected_ids)])
+
+    e = loaded.lookup_by_id(int(moving))
+    assert e.has(tag)
+    assert e.has_pair(tag, int(ids[0]))
+    np.testing.assert_array_equal(e.get(loaded.lookup("Velocity")), 1)
+
+
+def test_save_load_prefab(tmp_path):
+    """
+    Tests that prefabs are saved with their instances, and that loading over
+    entities already in use fails before creating anything.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float32', 3)
+
+    prefab = world.prefab()
+    prefab.set(velocity, np.full(3, 2, dtype='float32'))
+    e = world.entity()
+    e.is_a(prefab)
+    e.set(position, np.ones(3, dtype='float32'))
+
+    path = tmp_path / "world.flecs"
+    world.save(path)
+
+    loaded = flecs.World()
+    loaded.load(path)
+    loaded_prefab = loaded.lookup_by_id(int(prefab))
+    assert loaded_prefab.has(loaded.prefab_entity)
+    loaded_e = loaded.lookup_by_id(int(e))
+    assert loaded_e.has_pair(loaded.isa_entity, loaded_prefab)
+    np.testing.assert_array_equal(
+        loaded_e.get(loaded.lookup("Velocity")), 2)
+
+    count = loaded.stats()['entity_count']
+    with pytest.raises(RuntimeError):
+        loaded.load(path)
+    assert loaded.stats()['entity_count'] == count
+
+
+def test_stats():
+    """
+    Tests the iteration counters of queries and systems.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tag = world.tag("Tag")
+    for idx in range(10):
+        e = world.entity().set(position, np.zeros(3, dtype='float32'))
+        if idx % 2:
+            e.add(tag)
+
+    query = world.query_builder(position).build()
+    assert query.stats() == {}
+    query.enable_stats()
+    for _ in range(2):
+        for it in query:
+            it["Position"][:] += 1
+
+    stats = query.stats()
+    assert stats['iterations'] == 2
+    assert stats['tables'] == 4
+    assert stats['entities'] == 20
+    assert stats['views'] == 4
+
+    world.enable_stats()
+    system = world.system(lambda it: it["Position"], position)
+    world.progress()
+    assert system.stats()['entities'] == 10
+
+    report = world.stats_report()
+    assert {val['kind'] for val in report} == {'Query', 'System'}
+
+
+def test_world_stats_compact():
+    """
+    Tests the world statistics and deleting empty tables.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tag = world.tag("Tag")
+    ids = world.bulk_entity_w_id(position, 100, as_array=True)
+    tagged = world.entities_from_ids(ids[:10])
+    for e in tagged:
+        e.add(tag)
+
+    stats = world.stats()
+    assert stats['entity_count'] == 100
+    assert stats['components']['Position'] == {
+        'tables': 2, 'entities': 100, 'bytes_used': 100 * 12}
+
+    for e in tagged:
+        e.destruct()
+    empty_tables = world.stats()['empty_table_count']
+    assert empty_tables > 0
+
+    assert world.compact() > 0
+    stats = world.stats()
+    assert stats['empty_table_count'] < empty_tables
+    assert stats['entity_count'] == 90
+
+
+def test_world_stats_filter_cache():
+    """
+    Tests that collecting world statistics leaves the filter cache alone.
+    """
+    world = flecs.World(filter_cache_size=1)
+    position = world.component("Position", 'float32', 3)
+    world.tag("Tag")
+    world.bulk_entity_w_id(position, 10)
+
+    f = world.filter_builder(position).build()
+    query_count = world.stats()['query_count']
+    assert world.stats()['query_count'] == query_count
+    assert world.filter_builder(position).build().ptr is f.ptr
+
+
+def test_close():
+    """
+    Tests closing filters, queries and the world.
+    """
+    with flecs.World() as world:
+        position = world.component("Position", 'float32', 3)
+        e = world.entity().set(position, np.ones(3, dtype='float32'))
+        view = e.get(position)
+
+        with world.query_builder(position).build() as query:
+            for it in query:
+                # Abandon the iterator before it completes
+                it.close()
+                break
+        assert query.closed
+        with pytest.raises(RuntimeError):
+            list(query)
+
+        f = world.filter_builder(position).build()
+
+    assert world.closed
+    assert f.closed
+    with pytest.raises(RuntimeError):
+        e.get(position)
+
+    # Views keep the storage alive after the world is closed
+    np.testing.assert_array_equal(view, 1)
+
+
+def test_filter_cache():
+    """
+    Tests that equivalent filters share one compiled filter.
+    """
+    world = flecs.World(filter_cache_size=2)
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float32', 3)
+    world.entity().set(position, np.zeros(3, dtype='float32'))
+
+    f = world.filter_builder(position).build()
+    g = world.filter_builder(position).build()
+    assert g is not f
+    assert g.ptr is f.ptr
+    by_expr = world.filter_builder(expr='Position').build()
+    assert by_expr.ptr is not f.ptr
+
+    # Closing one build leaves the compiled filter to the others
+    with world.filter_builder(position).build() as h:
+        assert h.ptr is f.ptr
+    assert h.closed
+    assert not f.closed
+    assert sum(len(it) for it in g) == 1
+
+    # Queries track changes per query, so they are never shared
+    q = world.query_builder(position).build()
+    assert world.query_builder(position).build().ptr is not q.ptr
+
+    # Evicts the expression filter, which stays usable while referenced
+    world.filter_builder(velocity).build()
+    assert world.filter_builder(expr='Position').build().ptr is not by_expr.ptr
+    assert not by_expr.closed
+    assert sum(len(it) for it in by_expr) == 1
+
+
+def test_get_many():
+    """
+    Tests getting a component of many entities at once.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float32', 3)
+
+    entities = [world.entity() for _ in range(4)]
+    for idx, e in enumerate(entities[:3]):
+        e.set(position, np.full(3, idx, dtype='float32'))
+    entities[3].set(velocity, np.zeros(3, dtype='float32'))
+
+    ids = np.array([int(e) for e in entities[2::-1]], dtype=np.uint64)
+    values = world.get_many(position, ids)
+    assert values.shape == (3, 3)
+    np.testing.assert_equal(values[:, 0], [2, 1, 0])
+
+    ids = [int(e) for e in entities]
+    with pytest.raises(RuntimeError):
+        world.get_many("Position", ids)
+
+    values, mask = world.get_many("Position", ids, return_mask=True)
+    np.testing.assert_equal(mask, [True, True, True, False])
+    np.testing.assert_equal(values[3], 0)
+
+
+def test_set_add_remove_many():
+    """
+    Tests setting, adding and removing on many entities at once.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    tag = world.tag("Tag")
+
+    ids = world.bulk_entity_w_id(tag, 10, as_array=True)
+    world.remove_many(tag, ids[::2])
+    assert [world.lookup_by_id(e).has(tag) for e in ids] == [False, True] * 5
+
+    values = np.arange(30, dtype='float32').reshape(10, 3)
+    world.set_many(position, ids, values)
+    np.testing.assert_equal(world.get_many(position, ids), values)
+
+    with pytest.raises(RuntimeError):
+        world.set_many(position, ids, values.astype('float64'))
+    with pytest.raises(RuntimeError):
+        world.set_many("Position", ids[:5], values)
+
+    world.add_many(tag, ids)
+    assert all(world.lookup_by_id(e).has(tag) for e in ids)
+
+
+def test_filter_bulk_ops():
+    """
+    Tests adding, removing and deleting everything a filter matches.
+    """
+    world = flecs.World()
+    dead = world.tag("Dead")
+    purge = world.tag("Purge")
+    alive = world.bulk_entity_w_id(world.tag("Alive"), 5, as_array=True)
+    ids = world.bulk_entity_w_id(dead, 10, as_array=True)
+
+    f = world.filter_builder(dead).build()
+    assert f.bulk_add(purge) == 10
+    assert f.bulk_remove(dead) == 10
+    assert f.bulk_remove(dead) == 0
+
+    # Cached pairs referring to deleted entities are dropped
+    pair = world.lookup_by_id(int(world.pair(purge, int(ids[0]))))
+    assert world.filter_builder(purge).build().bulk_delete() == 10
+    assert not any(world.lookup_by_id(e).is_alive for e in ids)
+    assert all(world.lookup_by_id(e).is_alive for e in alive)
+    assert world.lookup_by_id(int(pair)) is not pair
+
+    # Prefabs are not matched, so only their instances are deleted
+    prefab = world.prefab()
+    prefab.add(dead)
+    instance = world.entity()
+    instance.is_a(prefab)
+    assert f.bulk_delete() == 1
+    assert not instance.is_alive
+    assert prefab.is_alive
+
+
+def test_spawn_columns():
+    """
+    Tests spawning rows with different signatures from columns.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float32', 3)
+    tag = world.tag("Tag")
+
+    prefab = world.prefab()
+    prefab.set(velocity, np.ones(3, dtype='float32'))
+
+    values = np.arange(18, dtype='float32').reshape(6, 3)
+    has_position = np.array([True, False, True, True, False, True])
+    has_tag = np.array([False, False, True, True, True, True])
+    ids = world.spawn_columns({position: (values, has_position),
+                               tag: has_tag,
+                               prefab: np.array([0, 3])})
+
+    assert len(ids) == 6
+    entities = world.entities_from_ids(ids)
+    assert [e.has(position) for e in entities] == list(has_position)
+    assert [e.has(tag) for e in entities] == list(has_tag)
+    instance = world.pair(world.isa_entity, prefab)
+    assert [e.has(instance) for e in entities] == [
+        True, False, False, True, False, False]
+    result, mask = world.get_many(position, ids, return_mask=True)
+    np.testing.assert_equal(mask, has_position)
+    np.testing.assert_equal(result[mask], values[has_position])
+
+    # Keys may be raw ids, names and pairs
+    likes = world.tag("Likes")
+    target = world.entity()
+    ids = world.spawn_columns({int(position): values,
+                               "Tag": np.array([1, 2]),
+                               world.pair(likes, target): has_position})
+    entities = world.entities_from_ids(ids)
+    np.testing.assert_equal(world.get_many(position, ids), values)
+    assert [e.has(tag) for e in entities] == [
+        False, True, True, False, False, False]
+    assert [e.has_pair(likes, target) for e in entities] == list(has_position)
+
+    with pytest.raises(RuntimeError):
+        world.spawn_columns({position: values.astype('float64')})
+
+    builder = world.bulk_entity_builder(6)
+    with pytest.raises(RuntimeError):
+        builder.add(position, values[:5])
@@ -82,6 +82,31 @@ def test_quickstart():
     assert not bob.has_pair(likes, alice)
 
 
+def test_entity_hashable():
+    """
+    Tests that entity handles can be used in sets and as dictionary keys.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    e = world.entity("Bob")
+    e2 = world.entity()
+
+    assert len({e, e2, world.lookup("Bob")}) == 2
+    assert {e: 1}[world.lookup("Bob")] == 1
+    assert int(e) in {e}
+    assert position in {world.lookup("Position")}
+
+    # Only ids compare equal to handles
+    assert e == np.uint64(int(e))
+    assert e != str(int(e))
+    assert e != "abc"
+    assert e != float(int(e))
+
+    # Handles only store the id and the world
+    assert not hasattr(e, '__dict__')
+    assert not hasattr(position, '__dict__')
+
+
 def test_hierarchy():
     world = flecs.World()
 
@@ -226,6 +251,11 @@ def test_filter():
 
         assert [e, e2] == val.entities[:]
 
+        ids = val.entity_ids
+        assert ids.dtype == np.uint64
+        assert not ids.flags.writeable
+        np.testing.assert_array_equal(ids, [int(e), int(e2)])
+
     for val in filter:
         pos_data = val["Position"]
         vel_data = val["Velocity"]
@@ -234,6 +264,38 @@ def test_filter():
         np.testing.assert_array_equal(vel_data, exp_vel)
 
 
+def test_filter_columns():
+    """
+    Tests that the precompiled plan yields shaped views for every table.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float32', 3)
+    tag = world.tag("Tag")
+
+    for idx in range(4):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32'))
+        e.set(velocity, np.ones(3, dtype='float32'))
+        if idx % 2:
+            e.add(tag)
+
+    filter = world.filter_builder(position, velocity).build()
+
+    num_tables = 0
+    for columns in filter.iter_columns():
+        assert columns.Position.shape == (2, 3)
+        assert columns.Velocity.dtype == np.float32
+        columns.Position[:] += columns.Velocity
+        num_tables += 1
+    assert num_tables == 2
+
+    for val in filter:
+        pos, vel = val.columns()
+        np.testing.assert_array_equal(pos, 1)
+        np.testing.assert_array_equal(val[-1], vel)
+
+
 def test_multiple_filters():
     """
     Tests out multiple filters.
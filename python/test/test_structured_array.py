@@ -3,6 +3,7 @@ This provides a test to ensure numpy structured arrays
 work as expected
 """
 import numpy as np
+import pytest
 import flecs
 
 
@@ -127,3 +128,74 @@ def test_structured_query():
         match_good += len(val)
 
     assert total_good == match_good
+
+
+def test_structured_record_batches():
+    """
+    Tests that structured components round trip through record batches.
+    """
+    pa = pytest.importorskip("pyarrow")
+
+    info_data = np.array([1, 2, 3], dtype=[('a', 'uint32'), ('b', 'float'),
+                                           ('c', 'uint8')])
+    world = flecs.World()
+    info = world.component_from_example("Info", info_data)
+    position = world.component("Position", 'float32', 3)
+    mass = world.component("Mass", 'float64')
+
+    for idx in range(10):
+        e = world.entity()
+        e.set(info, info_data + idx)
+        e.set(position, np.zeros(3, dtype='float32') + idx)
+        e.set(mass, np.array([idx], dtype='float64'))
+
+    query = world.query_builder(info, position, mass).build()
+    batches = list(query.to_record_batches())
+    assert len(batches) == 1
+    batch = batches[0]
+    assert batch.schema.names == ['entity', 'Info', 'Position', 'Mass']
+    # Info holds three structs per entity
+    info_type = batch.schema.field('Info').type
+    assert pa.types.is_fixed_size_list(info_type)
+    assert pa.types.is_struct(info_type.value_type)
+    assert pa.types.is_fixed_size_list(batch.schema.field('Position').type)
+
+    other = flecs.World()
+    other.component_from_example("Info", info_data)
+    other.component("Position", 'float32', 3)
+    other.component("Mass", 'float64')
+    ids = other.spawn_record_batches(batches)
+    assert len(ids) == 10
+
+    result = other.query_builder(other.lookup("Info"),
+                                 other.lookup("Position")).build()
+    np.testing.assert_array_equal(result.gather("Info"), query.gather(info))
+    np.testing.assert_array_equal(result.gather("Position"),
+                                  query.gather(position))
+
+
+def test_scalar_struct_record_batches():
+    """
+    Tests that a structured component holding a single struct maps to an
+    Arrow struct column.
+    """
+    pa = pytest.importorskip("pyarrow")
+
+    dtype = np.dtype([('a', 'uint32'), ('b', 'float')])
+    world = flecs.World()
+    point = world.component("Point", dtype, ())
+
+    values = np.zeros(10, dtype)
+    values['a'] = np.arange(10)
+    values['b'] = np.arange(10) * 0.5
+    for idx in range(len(values)):
+        world.entity().set(point, values[idx:idx + 1])
+
+    batches = list(world.filter_builder(point).build().to_record_batches())
+    assert pa.types.is_struct(batches[0].schema.field('Point').type)
+
+    other = flecs.World()
+    other.component("Point", dtype, ())
+    other.spawn_record_batches(batches)
+    result = other.filter_builder(other.lookup("Point")).build()
+    np.testing.assert_array_equal(result.gather("Point"), values)
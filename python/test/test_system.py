@@ -0,0 +1,81 @@
+"""
+Tests systems and running the world pipeline.
+"""
+import numpy as np
+import pytest
+import flecs
+
+
+def test_system_progress():
+    """
+    Tests that a system runs once per table every time the world progresses.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    velocity = world.component("Velocity", 'float32', 3)
+    tag = world.tag("Tag")
+
+    for idx in range(10):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32'))
+        e.set(velocity, np.ones(3, dtype='float32'))
+        if idx % 2:
+            e.add(tag)
+
+    num_calls = []
+
+    def move(it):
+        it["Position"][:] += it["Velocity"] * it.delta_time
+        num_calls.append(len(it))
+
+    world.system(move, position, velocity)
+
+    world.progress(1.0)
+    world.progress(2.0)
+
+    # Two tables, each visited once per frame
+    assert num_calls == [5, 5, 5, 5]
+
+    for val in world.each(position):
+        np.testing.assert_array_equal(val["Position"], 3)
+
+
+def test_system_error():
+    """
+    Tests that an exception raised inside a system propagates out of progress.
+    """
+    world = flecs.World()
+    position = world.component("Position", 'float32', 3)
+    world.entity().set(position, np.zeros(3, dtype='float32'))
+
+    def fail(it):
+        raise ValueError("failed")
+
+    world.system(fail, expr='Position')
+
+    with pytest.raises(ValueError):
+        world.progress()
+
+
+def test_system_multi_threaded():
+    """
+    Tests that a multi-threaded system visits every entity exactly once.
+    """
+    world = flecs.World()
+    world.set_threads(4)
+    position = world.component("Position", 'float32', 3)
+    tags = [world.tag(f"Tag{idx}") for idx in range(8)]
+
+    for idx in range(800):
+        e = world.entity()
+        e.set(position, np.zeros(3, dtype='float32'))
+        e.add(tags[idx % len(tags)])
+
+    def move(it):
+        it["Position"][:] += 1
+
+    world.system(move, position, multi_threaded=True)
+    world.progress()
+
+    for val in world.each(position):
+        np.testing.assert_array_equal(val["Position"], 1)